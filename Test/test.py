@@ -0,0 +1,261 @@
+import os
+import random
+import sys
+import types
+import unittest
+
+import cv2 as cv
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from game_clock import GameClock  # noqa: E402
+from game_logic import GameLogic  # noqa: E402
+from gestures import MOVES, NO_MOVE, NUM_LANDMARKS, PAPER, ROCK, SCISSORS, GestureVoter, classify_landmarks  # noqa: E402
+from image_processing import classify_hand  # noqa: E402
+from quality import QUALITY_LEVELS, QualityController  # noqa: E402
+from user_interaction import UserInteraction  # noqa: E402
+from user_interface import UserInterface  # noqa: E402
+
+
+def as_hand_landmarks(hand):
+    """Wrap a (21, 3) array in an object shaped like a MediaPipe landmark list."""
+    return types.SimpleNamespace(landmark=[types.SimpleNamespace(x=x, y=y, z=z) for x, y, z in hand.tolist()])
+
+
+class ClassifyHandTest(unittest.TestCase):
+    def test_single_hand_path_matches_batch_classifier(self):
+        rng = np.random.default_rng(0)
+        hands = rng.random((20000, NUM_LANDMARKS, 3), dtype=np.float32)
+        # Pull some tips close to their joints so the threshold edge is exercised
+        hands[::3, 8:21:4, 1] = hands[::3, 6:19:4, 1] - 0.05
+        expected = classify_landmarks(hands)
+        for hand, code in zip(hands, expected):
+            self.assertEqual(classify_hand(as_hand_landmarks(hand)), MOVES[code])
+
+
+class GestureVoterTest(unittest.TestCase):
+    def voter(self, reads, **kwargs):
+        voter = GestureVoter(**kwargs)
+        for tick, code in enumerate(reads):
+            voter.push(code, 1.0, tick)
+        return voter
+
+    def test_ema_is_not_decided_by_one_stray_read(self):
+        voter = self.voter([ROCK] * 6 + [PAPER], policy="ema")
+        self.assertEqual(voter.decide(0, 6), ROCK)
+
+    def test_ema_follows_a_sustained_change(self):
+        voter = self.voter([ROCK] * 3 + [PAPER] * 4, policy="ema")
+        self.assertEqual(voter.decide(0, 6), PAPER)
+
+    def test_majority_weighs_confidence(self):
+        voter = GestureVoter()
+        voter.push(ROCK, 0.4, 0)
+        voter.push(ROCK, 0.4, 1)
+        voter.push(SCISSORS, 0.9, 2)
+        self.assertEqual(voter.decide(0, 2), SCISSORS)
+
+    def test_ties_go_to_the_latest_read(self):
+        self.assertEqual(self.voter([SCISSORS, ROCK]).decide(0, 1), ROCK)
+        self.assertEqual(self.voter([PAPER, ROCK, ROCK, PAPER]).decide(0, 3), PAPER)
+        self.assertEqual(self.voter([SCISSORS, PAPER, PAPER, SCISSORS, NO_MOVE]).decide(0, 4), SCISSORS)
+
+    def test_only_reads_inside_the_window_count(self):
+        voter = self.voter([PAPER] * 5 + [ROCK] * 2 + [PAPER] * 5)
+        self.assertEqual(voter.decide(5, 6), ROCK)
+        self.assertEqual(voter.decide(20, 30), NO_MOVE)
+
+    def test_ring_wraps_around(self):
+        voter = self.voter([PAPER] * 8 + [SCISSORS] * 3, size=8)
+        self.assertEqual(len(voter), 8)
+        # Ticks 0-2 were overwritten; ticks 3-7 are still paper
+        self.assertEqual(voter.decide(0, 2), NO_MOVE)
+        self.assertEqual(voter.decide(0, 7), PAPER)
+        self.assertEqual(voter.decide(0, 10), PAPER)
+        self.assertEqual(voter.decide(8, 10), SCISSORS)
+
+    def test_no_valid_reads(self):
+        for policy in GestureVoter.POLICIES:
+            self.assertEqual(self.voter([NO_MOVE] * 5, policy=policy).decide(0, 4), NO_MOVE)
+        self.assertEqual(GestureVoter().decide(0, 100), NO_MOVE)
+
+    def test_reset_forgets_reads(self):
+        voter = self.voter([ROCK] * 4)
+        voter.reset()
+        self.assertEqual(len(voter), 0)
+        self.assertEqual(voter.decide(0, 4), NO_MOVE)
+
+
+class FakeTime:
+    """Manually advanced time source for GameClock."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class AdvanceTest(unittest.TestCase):
+    def setUp(self):
+        self.time = FakeTime()
+        self.clock = GameClock(self.time)
+        self.clock.reset()
+        self.game = GameLogic(rng=random.Random(0))
+        self.game.start_game()
+        # Record every clock value the game is stepped through
+        self.seen = []
+        update = self.game.update_game_state
+
+        def record(clock, *args):
+            self.seen.append(clock)
+            update(clock, *args)
+        self.game.update_game_state = record
+
+    def step(self, seconds, move="rock", fresh=True):
+        self.time.now += seconds
+        return self.game.advance(self.clock.poll(), move, move is not None, fresh=fresh)
+
+    def test_one_tick_per_frame_at_tick_rate(self):
+        for _ in range(30):
+            self.assertEqual(self.step(1 / GameLogic.TICK_RATE), 1)
+        self.assertEqual(self.game.clock, 30)
+
+    def test_remainder_is_carried_over(self):
+        # 1.5 ticks per call: 1, 2, 1, 2, ...
+        self.assertEqual([self.step(0.05) for _ in range(4)], [1, 2, 1, 2])
+        self.assertEqual(self.step(0.01), 0)
+        self.assertEqual(self.game.clock, 6)
+
+    def test_stall_replays_at_most_max_catchup_ticks(self):
+        self.assertEqual(self.step(2.0), GameLogic.MAX_CATCHUP_TICKS)
+        self.assertEqual(self.game.clock, GameLogic.MAX_CATCHUP_TICKS)
+        # The dropped time is not owed to later frames
+        self.assertEqual(self.step(1 / GameLogic.TICK_RATE), 1)
+
+    def test_no_phase_is_skipped_by_late_frames(self):
+        for seconds in [0.1, 0.25, 0.04, 0.3, 0.5, 0.07] * 3:
+            self.step(seconds)
+        self.assertGreater(len(self.seen), 100)
+        for previous, clock in zip(self.seen, self.seen[1:]):
+            self.assertEqual(clock, (previous + 1) % 100)
+
+    def test_decide_tick_fires_after_a_stall(self):
+        while self.game.clock < GameLogic.SHOOT_CLOCK - 5:
+            self.step(1 / GameLogic.TICK_RATE)
+        # One long frame across the whole vote window
+        self.step(0.5)
+        self.assertGreater(self.game.clock, GameLogic.SHOOT_CLOCK + GameLogic.VOTE_LAG)
+        self.assertIn(GameLogic.SHOOT_CLOCK + GameLogic.VOTE_LAG, self.seen)
+        self.assertTrue(self.game.move_decided)
+        self.assertEqual(self.game.player_move, "rock")
+
+    def test_stale_read_stops_counting_as_a_hand(self):
+        while self.game.clock < GameLogic.SHOOT_CLOCK - 20:
+            self.step(1 / GameLogic.TICK_RATE)
+        # The camera freezes: the last read is repeated but never renewed
+        while self.game.clock < GameLogic.SHOOT_CLOCK + GameLogic.VOTE_LAG + 1:
+            self.step(1 / GameLogic.TICK_RATE, fresh=False)
+        self.assertFalse(self.game.move_decided)
+        self.assertEqual(self.game.game_text, "Show exactly one hand!")
+
+    def test_briefly_repeated_read_still_counts(self):
+        while self.game.clock < GameLogic.SHOOT_CLOCK - 2:
+            self.step(1 / GameLogic.TICK_RATE)
+        for _ in range(GameLogic.MAX_READ_AGE):
+            self.step(1 / GameLogic.TICK_RATE, fresh=False)
+        self.assertTrue(self.game.move_decided)
+        self.assertEqual(self.game.player_move, "rock")
+
+    def test_paused_game_does_not_tick(self):
+        self.game.stop_game()
+        self.step(0.5)
+        self.assertEqual(self.game.clock, 0)
+
+
+class QualityControllerTest(unittest.TestCase):
+    def run_machine(self, loads, seconds, controller=None):
+        """Feed a controller frames whose cost is loads[level] of the budget; return its level changes."""
+        changes = []
+        controller = controller or QualityController(30, on_change=lambda level, settings: changes.append(level))
+        for _ in range(int(seconds * 30)):
+            controller.update(loads[controller.level] / 30)
+        return controller, changes
+
+    def test_steps_down_until_frames_fit(self):
+        controller, changes = self.run_machine([1.5, 1.3, 1.1, 1.0, 0.7, 0.4], 60)
+        self.assertEqual(controller.level, 4)
+        self.assertEqual(changes, [1, 2, 3, 4])
+
+    def test_steps_back_up_when_there_is_headroom(self):
+        controller = QualityController(30, level=len(QUALITY_LEVELS) - 1)
+        controller, _ = self.run_machine([0.3] * len(QUALITY_LEVELS), 60, controller)
+        self.assertEqual(controller.level, 0)
+
+    def test_settles_next_to_a_level_it_cannot_hold(self):
+        # Level 2 just overruns, level 3 has plenty of headroom
+        controller, changes = self.run_machine([1.5, 1.3, 1.0, 0.5, 0.4, 0.3], 30 * 60)
+        self.assertEqual(controller.level, 3)
+        self.assertEqual(changes, [1, 2, 3, 2, 3])
+        self.assertEqual(controller.best_level, 3)
+
+    def test_waits_for_the_cooldown_between_changes(self):
+        # The first cooldown windows (one second each) are not acted on
+        controller, changes = self.run_machine([2.0] * len(QUALITY_LEVELS), 2)
+        self.assertEqual(changes, [])
+        self.run_machine([2.0] * len(QUALITY_LEVELS), 1, controller)
+        self.assertEqual(controller.level, 1)
+
+
+class UserInteractionTest(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.interaction = UserInteraction(
+            "test", [],
+            on_start=lambda: self.calls.append("start"),
+            on_stop=lambda: self.calls.append("stop"),
+            on_restart=lambda: self.calls.append("reset"),
+            on_close=lambda: self.calls.append("close"))
+        self.buttons = self.interaction.setup_buttons()
+        self.ui = UserInterface()
+        self.ui.on_layout = self.interaction.set_layout
+        self.ui.layout_buttons(self.buttons)
+
+    def scan(self, x, y):
+        """The original linear hit test."""
+        for btn in self.buttons:
+            bx, by, bw, bh = btn["rect"]
+            if bx < x < bx + bw and by < y < by + bh:
+                return btn
+        return None
+
+    def test_hit_grid_matches_linear_scan_on_every_pixel(self):
+        for y in range(self.ui.screen_height):
+            for x in range(self.ui.screen_width):
+                self.assertIs(self.interaction.button_at(x, y), self.scan(x, y), (x, y))
+
+    def test_hit_grid_follows_layout_changes(self):
+        for i, btn in enumerate(self.buttons):
+            btn["rect"] = (i * 30, 0, 30, 20)
+        self.interaction.set_layout(self.buttons)
+        for y in range(-2, 25):
+            for x in range(-2, 125):
+                self.assertIs(self.interaction.button_at(x, y), self.scan(x, y), (x, y))
+
+    def test_events_run_only_in_process_events(self):
+        bx, by, bw, bh = self.buttons[0]["rect"]
+        self.interaction.mouse_callback(cv.EVENT_LBUTTONDOWN, bx + 1, by + 1, 0, None)
+        self.interaction.mouse_callback(cv.EVENT_MOUSEMOVE, bx + 1, by + 1, 0, None)
+        self.interaction.mouse_callback(cv.EVENT_LBUTTONDOWN, 0, 0, 0, None)
+        for key in (-1, 255, ord("p"), ord("x"), ord("q")):
+            self.interaction.handle_key(key)
+        self.assertEqual(self.calls, [])
+
+        self.interaction.process_events()
+        self.assertEqual(self.calls, ["start", "stop", "close"])
+        self.interaction.process_events()
+        self.assertEqual(self.calls, ["start", "stop", "close"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+"""Micro-benchmark for UserInterface.draw_circular_progress.
+
+Compares the cached ring raster against the original per-degree loop and
+checks that both produce the same pixels.
+
+Usage: python bench/bench_circular_progress.py [--repeat N]
+"""
+import argparse
+import os
+import sys
+import time
+from math import cos, sin, pi
+
+import cv2 as cv
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from user_interface import UserInterface  # noqa: E402
+
+
+def legacy_circular_progress(img, center, radius, progress, color):
+    """The original implementation: one cv.circle per degree."""
+    thickness = 10
+    for i in range(360):
+        angle = i * pi / 180
+        x = int(center[0] + radius * cos(angle))
+        y = int(center[1] + radius * sin(angle))
+        if i <= progress * 360:
+            cv.circle(img, (x, y), thickness // 2, color, -1)
+
+
+def time_per_call(draw, canvas, repeat):
+    start = time.perf_counter()
+    for n in range(repeat):
+        draw(canvas, (920, 220), 30, (n % 100) / 100, (102, 204, 153))
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    ui = UserInterface()
+    for clock in range(100):
+        expected = np.full((720, 1280, 3), 255, dtype=np.uint8)
+        actual = expected.copy()
+        legacy_circular_progress(expected, (920, 220), 30, clock / 100, (102, 204, 153))
+        ui.draw_circular_progress(actual, (920, 220), 30, clock / 100, (102, 204, 153))
+        if not np.array_equal(expected, actual):
+            print(f"output differs at clock={clock}")
+            return 1
+
+    canvas = np.full((720, 1280, 3), 255, dtype=np.uint8)
+    legacy = time_per_call(legacy_circular_progress, canvas, args.repeat)
+    cached = time_per_call(ui.draw_circular_progress, canvas, args.repeat)
+    print(f"legacy: {legacy * 1e6:8.1f} us/call")
+    print(f"cached: {cached * 1e6:8.1f} us/call  ({legacy / cached:.1f}x faster)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
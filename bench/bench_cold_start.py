@@ -0,0 +1,162 @@
+"""Measure cold-start time of the game, from process launch to the first frames.
+
+Each run starts a fresh interpreter that goes through rps_game's startup
+sequence with a null output sink and reports when it finished importing,
+showed its first UI frame, had the camera and model ready, and rendered
+its first camera frame. Times are medians over --runs, in milliseconds
+from process launch. ``sync`` builds the ImageProcessor before the UI, as
+the game used to; ``background`` shows the UI first and loads in parallel.
+Both use the current modules, MediaPipe's lazy import included, so ``sync``
+is not the old startup: --rev REV also times the startup of a git revision
+(e.g. the baseline) for a true before figure. Old revisions only open a
+camera or a video file, and show nothing until the first frame.
+
+For a per-module import breakdown use: python -X importtime src/rps_game.py
+
+Usage: python bench/bench_cold_start.py [--runs N] [--source SPEC] [--modes sync background] [--rev REV ...]
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+EVENTS = ("imported", "ui_shown", "ready", "first_frame")
+
+
+def child(mode, source):
+    """Run the startup sequence and print event timestamps as JSON."""
+    sys.path.insert(0, os.path.join(ROOT, "src"))
+    from game_logic import GameLogic
+    from image_processing import ImageProcessor
+    from pipeline import Pipeline
+    from sinks import NullSink
+    from user_interface import UserInterface
+    events = {"imported": time.monotonic()}
+    logging.disable(logging.INFO)
+
+    image_processor = None
+    if mode == "sync":
+        image_processor = ImageProcessor(source=source)
+    ui = UserInterface()
+    game_logic = GameLogic()
+    sink = NullSink()
+    if mode == "background":
+        image_processor = ImageProcessor(source=source, background=True)
+    placeholder = ui.message_frame("Starting camera...")
+    sink.write(ui.render(placeholder, game_logic.get_state(), []))
+    events["ui_shown"] = time.monotonic()
+    image_processor.wait_ready()
+    events["ready"] = time.monotonic()
+
+    pipeline = Pipeline(image_processor)
+    pipeline.start()
+    packet = None
+    while packet is None and not pipeline.finished:
+        packet = pipeline.get(timeout=0.1)
+    if packet is not None:
+        sink.write(ui.render(packet.frame, game_logic.get_state(), []))
+        events["first_frame"] = time.monotonic()
+    pipeline.stop()
+    image_processor.release()
+    print(json.dumps(events))
+
+
+def child_rev(src, source):
+    """Run an old revision's startup from its extracted src directory."""
+    sys.path.insert(0, src)
+    import cv2 as cv
+    import image_processing
+    from game_logic import GameLogic
+    from user_interface import UserInterface
+    events = {"imported": time.monotonic()}
+    logging.disable(logging.INFO)
+
+    # Old revisions always open camera 0; point them at the requested source
+    spec = int(source) if source.isdigit() else source
+    video_capture = cv.VideoCapture
+    cv.VideoCapture = lambda index: video_capture(spec)
+    image_processor = image_processing.ImageProcessor()
+    events["ready"] = time.monotonic()
+    ui = UserInterface()
+    game_logic = GameLogic()
+    frame = image_processor.capture_frame()
+    if frame is not None:
+        results = image_processor.process_hands(frame)
+        image_processor.draw_landmarks(frame, results)
+        ui.render(frame, game_logic.get_state(), [])
+        # Nothing was shown before the first camera frame
+        events["ui_shown"] = events["first_frame"] = time.monotonic()
+    image_processor.vid.release()
+    print(json.dumps(events))
+
+
+def extract_src(rev, dest):
+    """Extract src/ of a git revision into dest and return its path."""
+    os.makedirs(dest, exist_ok=True)
+    archive = os.path.join(dest, "src.tar")
+    subprocess.check_call(["git", "-C", ROOT, "archive", "-o", archive, rev, "src"])
+    with tarfile.open(archive) as tar:
+        tar.extractall(dest)
+    return os.path.join(dest, "src")
+
+
+def measure(mode, source, runs, src=None):
+    """Return {event: [ms since launch, ...]} over several fresh processes."""
+    samples = {event: [] for event in EVENTS}
+    command = [sys.executable, os.path.abspath(__file__), "--child", mode, "--source", source]
+    if src:
+        command += ["--child-src", src]
+    for _ in range(runs):
+        launched = time.monotonic()
+        output = subprocess.check_output(command, text=True)
+        events = json.loads(output.strip().splitlines()[-1])
+        for event, stamp in events.items():
+            samples[event].append((stamp - launched) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--source", default="0", help="capture source spec; use \"synthetic\" without a camera")
+    parser.add_argument("--modes", nargs="+", default=["sync", "background"], choices=["sync", "background"])
+    parser.add_argument("--rev", nargs="*", default=[],
+                        help="git revisions whose startup to time as well, e.g. the baseline")
+    parser.add_argument("--child", choices=["sync", "background", "rev"], help=argparse.SUPPRESS)
+    parser.add_argument("--child-src", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child == "rev":
+        child_rev(args.child_src, args.source)
+        return
+    if args.child:
+        child(args.child, args.source)
+        return
+    if args.rev and args.source == "synthetic":
+        parser.error("--rev needs a camera index or a video file; old revisions have no synthetic source")
+
+    def report(label, samples):
+        print(f"{label:>10} " + " ".join(
+            f"{statistics.median(samples[event]):>10.0f}ms" if samples[event] else f"{'-':>12}"
+            for event in EVENTS))
+
+    print(f"{'mode':>10} " + " ".join(f"{event:>12}" for event in EVENTS))
+    with tempfile.TemporaryDirectory() as tmp:
+        for rev in args.rev:
+            src = extract_src(rev, os.path.join(tmp, rev.replace("/", "_")))
+            report(rev, measure("rev", args.source, args.runs, src))
+    for mode in args.modes:
+        report(mode, measure(mode, args.source, args.runs))
+    if "sync" in args.modes:
+        print("note: sync uses the current lazy-importing modules; use --rev for the old startup")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""End-to-end benchmark of the game loop without a camera or display.
+
+Drives the real ImageProcessor, GameLogic and UserInterface frame by frame
+from a non-realtime capture source (synthetic frames by default, or a
+recorded video / image directory). With --landmarks, MediaPipe is replaced
+by canned hand results - a built-in rock/paper/scissors cycle or an
+(N, 21, 3) .npy file where NaN rows mean "no hand" - so runs are
+repeatable and measure everything around the model. MediaPipe is then
+never imported, so its landmark drawing is skipped as well.
+
+Reports per-stage and per-frame latency percentiles, throughput and memory
+high-water marks as JSON. --save writes the report; --baseline compares
+against a saved one and exits with status 1 if anything regressed by more
+than --tolerance.
+
+Usage: python bench/bench_end_to_end.py [--frames N] [--source SPEC] [--landmarks cycle|FILE.npy]
+                                        [--save FILE] [--baseline FILE]
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+import types
+
+import cv2 as cv
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "src"))
+from capture import SyntheticSource, make_source  # noqa: E402
+from game_logic import GameLogic  # noqa: E402
+from gestures import MOVES, NUM_LANDMARKS  # noqa: E402
+from image_processing import ImageProcessor  # noqa: E402
+from profiler import profiler  # noqa: E402
+from quality import QUALITY_LEVELS, apply_quality  # noqa: E402
+from user_interface import UserInterface  # noqa: E402
+
+# Harness stages; the instrumented modules add their own finer spans
+STAGES = ("capture", "inference", "classify", "game", "render", "frame")
+
+
+def pose(move):
+    """Return a (21, 3) landmark array that classifies as the given move."""
+    hand = np.zeros((NUM_LANDMARKS, 3), dtype=np.float32)
+    hand[:, 0] = np.linspace(0.45, 0.55, NUM_LANDMARKS)
+    hand[:, 1] = 0.6
+    hand[0] = (0.5, 0.85, 0.0)
+    extended = {"rock": [], "paper": [8, 12, 16, 20], "scissors": [8, 12]}[move]
+    for pip, tip in zip((6, 10, 14, 18), (8, 12, 16, 20)):
+        hand[pip, 1] = 0.55
+        hand[tip, 1] = 0.35 if tip in extended else 0.65
+    return hand
+
+
+def landmark_script(spec, hold=45):
+    """Return an (N, 21, 3) landmark sequence; NaN rows mean no hand."""
+    if spec != "cycle":
+        return np.load(spec).astype(np.float32)
+    blank = np.full((NUM_LANDMARKS, 3), np.nan, dtype=np.float32)
+    frames = [pose(move) for move in MOVES] + [blank]
+    return np.repeat(np.stack(frames), hold, axis=0)
+
+
+class CannedHands:
+    """Stand-in for mp_hands.Hands that replays landmark arrays as MediaPipe-shaped results.
+
+    Results are plain objects with the attributes the game reads, so
+    MediaPipe does not need to be installed.
+    """
+
+    def __init__(self, script):
+        self._results = []
+        for hand in script:
+            if np.isnan(hand).any():
+                self._results.append(types.SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None))
+                continue
+            landmarks = types.SimpleNamespace(
+                landmark=[types.SimpleNamespace(x=x, y=y, z=z) for x, y, z in hand.tolist()])
+            handedness = types.SimpleNamespace(
+                classification=[types.SimpleNamespace(index=1, score=0.95, label="Right")])
+            self._results.append(types.SimpleNamespace(multi_hand_landmarks=[landmarks],
+                                                       multi_handedness=[handedness]))
+        self._index = 0
+
+    def process(self, image):
+        result = self._results[self._index % len(self._results)]
+        self._index += 1
+        return result
+
+    def close(self):
+        pass
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "-C", ROOT, "rev-parse", "--short", "HEAD"],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def open_bench_source(spec, width, height, frames):
+    """Build a source that yields frames as fast as they are read."""
+    if spec == "synthetic":
+        return SyntheticSource(width, height, frames=frames, realtime=False)
+    if str(spec).isdigit():
+        return make_source(spec, width, height)
+    return make_source(spec, width, height, loop=True, realtime=False)
+
+
+def run(args):
+    """Run the benchmark and return the report dict."""
+    hands = CannedHands(landmark_script(args.landmarks)) if args.landmarks else None
+    image_processor = ImageProcessor(args.width, args.height,
+                                     source=open_bench_source(args.source, args.width, args.height,
+                                                              args.warmup + args.frames),
+                                     hands=hands)
+    game_logic = GameLogic(rng=random.Random(args.seed))
+    ui = UserInterface(video_width=args.width, video_height=args.height, glass_quality=args.glass)
+    if args.quality is not None:
+        apply_quality(QUALITY_LEVELS[args.quality], image_processor, ui)
+    buttons = []
+    tick = 1 / game_logic.TICK_RATE
+
+    profiler.enabled = True
+    game_logic.start_game()
+    frames = 0
+    matches = 0
+    start = None
+    try:
+        for i in range(args.warmup + args.frames):
+            if i == args.warmup:
+                # Steady state only: drop warm-up timings, start counting memory
+                profiler.reset()
+                if args.trace_memory:
+                    tracemalloc.start()
+                start = time.perf_counter()
+            with profiler.span("frame"):
+                with profiler.span("capture"):
+                    frame = image_processor.capture_frame()
+                if frame is None:
+                    break
+                with profiler.span("inference"):
+                    results = image_processor.process_hands(frame)
+                    if hands is None:
+                        image_processor.draw_landmarks(frame, results)
+                with profiler.span("classify"):
+                    move, success, confidence = None, False, 0.0
+                    if results.multi_hand_landmarks and len(results.multi_hand_landmarks) == 1:
+                        move = image_processor.get_hand_move(results.multi_hand_landmarks[0])
+                        confidence = results.multi_handedness[0].classification[0].score
+                        success = True
+                with profiler.span("game"):
+                    game_logic.advance(tick, move, success, confidence)
+                    image_processor.full_rate = game_logic.is_sampling_move()
+                    if game_logic.match_ended:
+                        matches += 1
+                        game_logic.restart_game()
+                        game_logic.start_game()
+                with profiler.span("render"):
+                    ui.render(frame, game_logic.get_state(), buttons)
+                image_processor.release_frame(frame)
+            if i >= args.warmup:
+                frames += 1
+        elapsed = time.perf_counter() - start if start is not None else 0.0
+        traced_peak = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None
+    finally:
+        tracemalloc.stop()
+        profiler.enabled = False
+        image_processor.release()
+
+    if not frames:
+        raise SystemExit("No frames were benchmarked; is the source readable?")
+    stages = {}
+    for name, s in profiler.snapshot().items():
+        stages[name] = {
+            "count": s["count"],
+            "fps": s["count"] / s["sum"] if s["sum"] else None,
+            **{f"{key}_ms": round(s[key] * 1000, 4) for key in ("mean", "p50", "p95", "p99", "max")},
+        }
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "opencv": cv.__version__,
+            "machine": platform.machine(),
+            "args": vars(args),
+        },
+        "frames": frames,
+        "elapsed_s": round(elapsed, 4),
+        "fps": round(frames / elapsed, 2),
+        "matches": matches,
+        "stages": stages,
+        "memory": {
+            "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            "traced_peak_kb": None if traced_peak is None else traced_peak // 1024,
+            "frame_pool_buffers": image_processor.frame_pool.allocated,
+        },
+    }
+
+
+def compare(report, baseline, tolerance, min_ms):
+    """Return human-readable regressions of report against baseline."""
+    regressions = []
+    if report["fps"] < baseline["fps"] * (1 - tolerance):
+        regressions.append(f"fps {baseline['fps']:.1f} -> {report['fps']:.1f}")
+    for name in STAGES:
+        old, new = baseline["stages"].get(name), report["stages"].get(name)
+        if not old or not new:
+            continue
+        for key in ("p50_ms", "p95_ms"):
+            # Sub-floor stages are dominated by timer noise
+            if old[key] >= min_ms and new[key] > old[key] * (1 + tolerance):
+                regressions.append(f"{name} {key} {old[key]:.3f} -> {new[key]:.3f}")
+    old_rss, new_rss = baseline["memory"]["max_rss_kb"], report["memory"]["max_rss_kb"]
+    if new_rss > old_rss * (1 + tolerance):
+        regressions.append(f"max_rss_kb {old_rss} -> {new_rss}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--warmup", type=int, default=30)
+    parser.add_argument("--source", default="synthetic", help="synthetic, a video file or an image directory")
+    parser.add_argument("--landmarks", help='"cycle" or a .npy file of canned landmarks instead of MediaPipe')
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--glass", default="high", choices=UserInterface.GLASS_QUALITIES)
+    parser.add_argument("--quality", type=int, choices=range(len(QUALITY_LEVELS)),
+                        help="run at this adaptive quality level (overrides --glass)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="also report the tracemalloc peak (slows the run down)")
+    parser.add_argument("--save", help="write the report to this JSON file")
+    parser.add_argument("--baseline", help="compare against a report saved with --save")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed relative slowdown")
+    parser.add_argument("--min-ms", type=float, default=0.5, help="ignore stages faster than this")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    report = run(args)
+    print(json.dumps(report, indent=2))
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance, args.min_ms)
+        for line in regressions:
+            print(f"REGRESSION: {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print("No regressions against baseline", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark the per-tick cost of GameLogic.update_game_state + get_state.
+
+Runs the working tree's GameLogic and, with --rev, the GameLogic from an
+older git revision for comparison. Debug logging is disabled so only the
+work the game loop always pays for is measured. Each revision is timed
+--repeat times, interleaved, and the best run is reported, which keeps
+noise from other processes out of the comparison.
+
+Usage: python bench/bench_game_tick.py [--ticks N] [--repeat N] [--rev REV ...]
+"""
+import argparse
+import logging
+import os
+import random
+import subprocess
+import sys
+import time
+import types
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+
+def load_game_logic(rev=None):
+    """Return the GameLogic class from the working tree or a git revision."""
+    if rev is None:
+        import game_logic
+        return game_logic.GameLogic
+    source = subprocess.check_output(["git", "-C", ROOT, "show", f"{rev}:src/game_logic.py"])
+    module = types.ModuleType(f"game_logic_{rev}")
+    exec(compile(source, f"{rev}:src/game_logic.py", "exec"), module.__dict__)
+    return module.GameLogic
+
+
+def time_per_tick(game_logic_cls, ticks, seed=0):
+    rng = random.Random(seed)
+    moves = [rng.choice(("rock", "paper", "scissors", None)) for _ in range(1024)]
+    game_logic = game_logic_cls()
+    game_logic.start_game()
+    start = time.perf_counter()
+    for tick in range(ticks):
+        if game_logic.match_ended:
+            game_logic.restart_game()
+            game_logic.start_game()
+        game_logic.clock = (game_logic.clock + 1) % 100
+        move = moves[tick & 1023]
+        game_logic.update_game_state(game_logic.clock, move, move is not None)
+        game_logic.get_state()
+    return (time.perf_counter() - start) / ticks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ticks", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5, help="runs per revision; the fastest is reported")
+    parser.add_argument("--rev", nargs="*", default=[], help="git revisions to compare against")
+    args = parser.parse_args()
+
+    logging.disable(logging.DEBUG)
+    revs = args.rev + [None]
+    classes = [load_game_logic(rev) for rev in revs]
+    best = [float("inf")] * len(revs)
+    for _ in range(args.repeat):
+        for i, game_logic_cls in enumerate(classes):
+            best[i] = min(best[i], time_per_tick(game_logic_cls, args.ticks))
+    for rev, cost in zip(revs, best):
+        print(f"{rev or 'working tree':>14}: {cost * 1e6:6.2f} us/tick")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Benchmark InferenceService throughput against the number of workers.
+
+Feeds the same frames through services with different worker counts,
+keeping a fixed number of requests in flight, and reports frames per
+second and request latency. Use --video to run on a recording with real
+hands; otherwise random noise frames are used.
+
+Usage: python bench/bench_inference_service.py [--workers 1 2 4] [--frames N] [--video FILE]
+"""
+import argparse
+import collections
+import os
+import sys
+import time
+
+import cv2 as cv
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from inference_service import InferenceService  # noqa: E402
+
+
+def load_frames(video, count, width, height):
+    if video is None:
+        rng = np.random.default_rng(0)
+        return [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(min(count, 32))]
+    frames = []
+    vid = cv.VideoCapture(video)
+    while len(frames) < count:
+        ret, frame = vid.read()
+        if not ret:
+            break
+        frames.append(cv.resize(frame, (width, height)))
+    vid.release()
+    if not frames:
+        raise SystemExit(f"No frames could be read from {video}")
+    return frames
+
+
+def run(workers, frames, total, in_flight):
+    service = InferenceService(workers, frames[0].shape, slots_per_worker=2, default_timeout=3600)
+    service.wait_ready()
+    latencies = []
+    pending = collections.deque()
+    start = time.perf_counter()
+    for i in range(total):
+        if len(pending) >= in_flight:
+            submitted, future = pending.popleft()
+            future.result()
+            latencies.append(time.perf_counter() - submitted)
+        pending.append((time.perf_counter(), service.detect(frames[i % len(frames)])))
+    for submitted, future in pending:
+        future.result()
+        latencies.append(time.perf_counter() - submitted)
+    elapsed = time.perf_counter() - start
+    service.close()
+    return total / elapsed, np.percentile(latencies, [50, 95]) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--in-flight", type=int, default=None, help="requests in flight (default: 2 per worker)")
+    parser.add_argument("--video", default=None)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    args = parser.parse_args()
+
+    frames = load_frames(args.video, args.frames, args.width, args.height)
+    print(f"{'workers':>8} {'fps':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for workers in args.workers:
+        fps, (p50, p95) = run(workers, frames, args.frames, args.in_flight or 2 * workers)
+        print(f"{workers:>8} {fps:>8.1f} {p50:>8.1f} {p95:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
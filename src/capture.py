@@ -0,0 +1,388 @@
+"""Pluggable frame sources for the game and the benchmarks.
+
+Every source follows the ``cv.VideoCapture`` reading convention:
+``read(dst=None)`` returns ``(ok, frame)`` and fills ``dst`` when it has
+the right shape. ``open_source`` picks a source from a command-line style
+spec and, for live sources, wraps it in a FrameGrabber so the driver's
+own frame buffer never holds stale frames.
+
+Specs: a device index ("0"), "synthetic", a directory or glob of images,
+or anything else VideoCapture can open (video file or stream URL).
+Files and image sequences are paced at their frame rate by default, as
+live play needs; benchmarks pass ``realtime=False`` to read them flat out.
+"""
+import glob
+import logging
+import os
+import threading
+import time
+
+import cv2 as cv
+import numpy as np
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+def fourcc_to_str(code):
+    """Decode a CAP_PROP_FOURCC value into its four-character name."""
+    code = int(code)
+    return "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4)).strip("\0")
+
+
+class Pacer:
+    """Sleep so that successive ticks are spaced at a fixed rate."""
+
+    def __init__(self, fps):
+        self.interval = 1.0 / fps if fps else 0.0
+        self._next = None
+
+    def wait(self):
+        if not self.interval:
+            return
+        now = time.monotonic()
+        if self._next is None or now - self._next > self.interval:
+            # First tick, or too far behind to catch up: restart the schedule
+            self._next = now
+        elif self._next > now:
+            time.sleep(self._next - now)
+        self._next += self.interval
+
+
+class FrameSource:
+    """Base class for frame sources.
+
+    ``live`` sources produce frames on their own schedule and should be
+    read through a FrameGrabber; the others are read on demand.
+    """
+
+    live = False
+    width = 0
+    height = 0
+    fps = 0.0
+
+    def open(self):
+        """Open the source and return True on success."""
+        return True
+
+    @property
+    def opened(self):
+        return True
+
+    def read(self, dst=None):
+        raise NotImplementedError
+
+    def release(self):
+        pass
+
+    def describe(self):
+        return f"{type(self).__name__} {self.width}x{self.height} @ {self.fps:g}fps"
+
+
+class DeviceSource(FrameSource):
+    """A camera opened with the requested resolution, rate, pixel format and buffer size.
+
+    Cameras are free to ignore any of these, so the values actually in
+    effect are read back after opening and exposed as width, height, fps
+    and fourcc.
+    """
+
+    live = True
+
+    def __init__(self, index=0, width=640, height=480, fps=30, fourcc="MJPG", buffer_size=1, api=cv.CAP_ANY):
+        self.index = index
+        self.requested = (width, height, fps, fourcc)
+        self.buffer_size = buffer_size
+        self.api = api
+        self.fourcc = ""
+        self.vid = None
+
+    def open(self):
+        width, height, fps, fourcc = self.requested
+        self.vid = cv.VideoCapture(self.index, self.api)
+        if not self.vid.isOpened():
+            return False
+        # The pixel format has to be chosen before the resolution, as it
+        # decides which sizes and rates the camera offers
+        if fourcc:
+            self.vid.set(cv.CAP_PROP_FOURCC, cv.VideoWriter_fourcc(*fourcc))
+        self.vid.set(cv.CAP_PROP_FRAME_WIDTH, width)
+        self.vid.set(cv.CAP_PROP_FRAME_HEIGHT, height)
+        if fps:
+            self.vid.set(cv.CAP_PROP_FPS, fps)
+        if self.buffer_size:
+            self.vid.set(cv.CAP_PROP_BUFFERSIZE, self.buffer_size)
+        self.width = int(self.vid.get(cv.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.vid.get(cv.CAP_PROP_FRAME_HEIGHT))
+        self.fps = self.vid.get(cv.CAP_PROP_FPS)
+        self.fourcc = fourcc_to_str(self.vid.get(cv.CAP_PROP_FOURCC))
+        if (self.width, self.height) != (width, height) or (fourcc and self.fourcc != fourcc):
+            logging.info("Camera %s: requested %dx%d %s, got %s", self.index, width, height, fourcc, self.describe())
+        return True
+
+    @property
+    def opened(self):
+        return self.vid is not None and self.vid.isOpened()
+
+    def read(self, dst=None):
+        return self.vid.read(dst)
+
+    def release(self):
+        if self.vid is not None:
+            self.vid.release()
+
+    def describe(self):
+        return f"camera {self.index} {self.width}x{self.height} @ {self.fps:g}fps {self.fourcc}"
+
+
+class VideoFileSource(FrameSource):
+    """Frames from a video file or stream, optionally looped and paced at the file's frame rate.
+
+    Stream URLs arrive at their own rate, so they are always live and never
+    paced; the grabber drains them so their buffer cannot go stale.
+    """
+
+    def __init__(self, path, loop=False, realtime=True):
+        self.path = path
+        self.loop = loop
+        self.stream = "://" in str(path)
+        self.realtime = realtime and not self.stream
+        self.live = realtime or self.stream
+        self.vid = None
+        self._pacer = None
+
+    def open(self):
+        self.vid = cv.VideoCapture(self.path)
+        if not self.vid.isOpened():
+            return False
+        self.width = int(self.vid.get(cv.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.vid.get(cv.CAP_PROP_FRAME_HEIGHT))
+        self.fps = self.vid.get(cv.CAP_PROP_FPS) or 30.0
+        self._pacer = Pacer(self.fps) if self.realtime else None
+        return True
+
+    @property
+    def opened(self):
+        return self.vid is not None and self.vid.isOpened()
+
+    def read(self, dst=None):
+        if self._pacer:
+            self._pacer.wait()
+        ret, frame = self.vid.read(dst)
+        if not ret and self.loop:
+            self.vid.set(cv.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.vid.read(dst)
+        return ret, frame
+
+    def release(self):
+        if self.vid is not None:
+            self.vid.release()
+
+    def describe(self):
+        return f"video {self.path} {self.width}x{self.height} @ {self.fps:g}fps"
+
+
+class ImageSequenceSource(FrameSource):
+    """Frames from a sorted list of image files.
+
+    With ``preload`` every image is decoded once up front, so benchmarks
+    measure the pipeline rather than the disk and the JPEG decoder.
+    """
+
+    def __init__(self, paths, fps=30, loop=False, realtime=True, preload=False):
+        self.paths = list(paths)
+        self.fps = fps
+        self.loop = loop
+        self.live = realtime
+        self.preload = preload
+        self._frames = None
+        self._index = 0
+        self._pacer = Pacer(fps) if realtime else None
+
+    @classmethod
+    def from_pattern(cls, pattern, **kwargs):
+        """Build a sequence from a directory or a glob pattern."""
+        if os.path.isdir(pattern):
+            paths = [os.path.join(pattern, name) for name in os.listdir(pattern)
+                     if name.lower().endswith(IMAGE_EXTENSIONS)]
+        else:
+            paths = glob.glob(pattern)
+        return cls(sorted(paths), **kwargs)
+
+    def open(self):
+        if not self.paths:
+            return False
+        first = cv.imread(self.paths[0])
+        if first is None:
+            return False
+        self.height, self.width = first.shape[:2]
+        if self.preload:
+            self._frames = [first] + [cv.imread(path) for path in self.paths[1:]]
+        return True
+
+    @property
+    def opened(self):
+        return bool(self.paths)
+
+    def read(self, dst=None):
+        if self._index >= len(self.paths):
+            if not self.loop:
+                return False, dst
+            self._index = 0
+        if self._pacer:
+            self._pacer.wait()
+        index = self._index
+        self._index += 1
+        frame = self._frames[index] if self._frames is not None else cv.imread(self.paths[index])
+        if frame is None:
+            logging.warning("Could not read image %s", self.paths[index])
+            return False, dst
+        if dst is not None and dst.shape == frame.shape:
+            np.copyto(dst, frame)
+            return True, dst
+        return True, frame.copy() if self._frames is not None else frame
+
+    def describe(self):
+        return f"{len(self.paths)} images {self.width}x{self.height} @ {self.fps:g}fps"
+
+
+class SyntheticSource(FrameSource):
+    """Generated frames: a fixed gradient with a moving disc, for running without any hardware.
+
+    ``frames`` limits the length of the stream; None means endless.
+    """
+
+    def __init__(self, width=640, height=480, fps=30, frames=None, realtime=True):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.frames = frames
+        self.live = realtime
+        self._count = 0
+        self._pacer = Pacer(fps) if realtime else None
+        x = np.linspace(0, 255, width, dtype=np.float32)
+        y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+        self._background = np.dstack([np.broadcast_to(x, (height, width)),
+                                      np.broadcast_to(y, (height, width)),
+                                      np.full((height, width), 96, np.float32)]).astype(np.uint8)
+
+    def read(self, dst=None):
+        if self.frames is not None and self._count >= self.frames:
+            return False, dst
+        if self._pacer:
+            self._pacer.wait()
+        if dst is None or dst.shape != self._background.shape:
+            dst = np.empty_like(self._background)
+        np.copyto(dst, self._background)
+        t = self._count / (self.fps or 30)
+        center = (int(self.width * (0.5 + 0.35 * np.cos(t))), int(self.height * (0.5 + 0.35 * np.sin(t))))
+        cv.circle(dst, center, max(8, self.height // 10), (255, 255, 255), -1)
+        self._count += 1
+        return True, dst
+
+
+class FrameGrabber:
+    """Keep reading a live source on a background thread, holding only the newest frame.
+
+    Draining the source continuously stops the driver from queueing up
+    frames, so ``read`` always returns the most recent capture. ``read``
+    blocks until a frame newer than the last one returned is available.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.grabbed = 0
+        self.dropped = 0
+        self._latest = None
+        self._back = None
+        self._seq = 0
+        self._read_seq = 0
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._grab_loop, name="grabber", daemon=True)
+        self._thread.start()
+        return self
+
+    def _grab_loop(self):
+        while self._running:
+            ret, frame = self.source.read(self._back)
+            if not ret:
+                logging.debug("Source %s returned no frame, stopping grabber", self.source.describe())
+                break
+            with self._cond:
+                if self._seq > self._read_seq:
+                    self.dropped += 1
+                self._back, self._latest = self._latest, frame
+                self._seq += 1
+                self.grabbed += 1
+                self._cond.notify_all()
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+    @property
+    def opened(self):
+        return self.source.opened
+
+    def read(self, dst=None):
+        """Return (ok, frame) with the newest frame copied into dst.
+
+        Waits as long as the grabber thread is running, however slow the
+        source is to deliver (cameras can take seconds to warm up); ok is
+        False only once the source has ended or the grabber was released.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq > self._read_seq or not self._running)
+            if self._seq == self._read_seq:
+                return False, dst
+            self._read_seq = self._seq
+            if dst is None or dst.shape != self._latest.shape:
+                dst = np.empty_like(self._latest)
+            np.copyto(dst, self._latest)
+            return True, dst
+
+    def release(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        self.source.release()
+
+    def describe(self):
+        return self.source.describe()
+
+
+def make_source(spec, width=640, height=480, fps=30, **kwargs):
+    """Build an unopened FrameSource from a spec string or device index."""
+    if isinstance(spec, FrameSource):
+        return spec
+    if isinstance(spec, int) or str(spec).isdigit():
+        return DeviceSource(int(spec), width, height, fps, **kwargs)
+    if spec == "synthetic":
+        return SyntheticSource(width, height, fps, **kwargs)
+    # URLs may contain "?" (rtsp://cam/stream?channel=1), so test them before globs
+    if "://" in spec:
+        return VideoFileSource(spec, **kwargs)
+    if os.path.isdir(spec) or any(c in spec for c in "*?["):
+        return ImageSequenceSource.from_pattern(spec, fps=fps, **kwargs)
+    return VideoFileSource(spec, **kwargs)
+
+
+def open_source(spec, width=640, height=480, fps=30, **kwargs):
+    """Open a source for reading, behind a started FrameGrabber if it is live.
+
+    A source that fails to open is still returned; check ``opened``.
+    """
+    source = make_source(spec, width, height, fps, **kwargs)
+    if not source.open():
+        logging.error("Cannot open capture source %r", spec)
+        return source
+    logging.info("Capturing from %s", source.describe())
+    if source.live:
+        return FrameGrabber(source).start()
+    return source
@@ -0,0 +1,37 @@
+import collections
+import logging
+import threading
+
+import numpy as np
+
+
+class FramePool:
+    """Free list of preallocated frame buffers of one shape.
+
+    Buffers are handed out with ``acquire`` and given back with ``release``
+    once nothing reads them any more. When the free list runs dry a new
+    buffer is allocated, so a consumer that never releases degrades to
+    plain per-frame allocation instead of blocking.
+    """
+
+    def __init__(self, shape, dtype=np.uint8, size=4):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.allocated = size
+        self._free = collections.deque(np.empty(self.shape, dtype=self.dtype) for _ in range(size))
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Return a free buffer, allocating one if none is left."""
+        with self._lock:
+            if self._free:
+                return self._free.pop()
+            self.allocated += 1
+        logging.debug("Frame pool grew to %d buffers", self.allocated)
+        return np.empty(self.shape, dtype=self.dtype)
+
+    def release(self, buffer):
+        """Return a buffer to the pool; buffers of another shape are ignored."""
+        if buffer is not None and buffer.shape == self.shape and buffer.dtype == self.dtype:
+            with self._lock:
+                self._free.append(buffer)
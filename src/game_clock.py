@@ -0,0 +1,26 @@
+import time
+
+
+class GameClock:
+    """Monotonic time source for the game loop.
+
+    Each ``poll`` returns the seconds elapsed since the previous one, measured
+    with ``time.monotonic`` so wall-clock adjustments cannot speed up, stall
+    or rewind the game. Turning that time into game ticks is left to
+    ``GameLogic.advance``.
+    """
+
+    def __init__(self, time_source=time.monotonic):
+        self._time_source = time_source
+        self._last = None
+
+    def reset(self):
+        """Start measuring from now; the next poll returns 0."""
+        self._last = self._time_source()
+
+    def poll(self):
+        """Return the seconds elapsed since the last poll (0 on the first)."""
+        now = self._time_source()
+        elapsed = 0.0 if self._last is None else now - self._last
+        self._last = now
+        return elapsed
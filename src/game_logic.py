@@ -1,8 +1,56 @@
+import operator
 import random
 import logging
+from gestures import GestureVoter, MOVES, NO_MOVE, OUTCOMES
 
 # Setup logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Move name -> integer code
+MOVE_CODES = {move: code for code, move in enumerate(MOVES)}
+
+# Status suffix per round outcome (see gestures.OUTCOMES)
+ROUND_RESULT_TEXT = {
+    0: " | Draw!",
+    1: " | You win this round!",
+    -1: " | Computer wins this round!"
+}
+
+class GameSnapshot:
+    """Game state handed to the renderer, updated in place.
+
+    ``version`` is bumped whenever any field changes, so consumers can skip
+    work when it is the same as the last one they saw.
+    """
+    __slots__ = ("game_state", "clock", "player_move", "computer_move", "round_number",
+                 "player_score", "computer_score", "match_ended", "game_text", "version")
+    FIELDS = __slots__[:-1]
+
+    def __init__(self):
+        for field in self.FIELDS:
+            setattr(self, field, None)
+        self.version = 0
+
+    def __getitem__(self, field):
+        return getattr(self, field)
+
+    def as_dict(self):
+        """Return the fields as a new dict."""
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+def _snapshot_field(name):
+    """Property that stores a GameLogic field on its snapshot and bumps its version on change."""
+    # attrgetter runs in C, so reads cost about a third of a Python getter
+    get = operator.attrgetter(f"_snapshot.{name}")
+
+    def set(self, value):
+        snapshot = self._snapshot
+        if getattr(snapshot, name) != value:
+            setattr(snapshot, name, value)
+            snapshot.version += 1
+
+    return property(get, set)
 
 class GameLogic:
     # Game state constants
@@ -14,7 +62,42 @@ class GameLogic:
         "MATCH_ENDED": "match_ended"
     }
 
-    def __init__(self):
+    _RUNNING = GAME_STATES["RUNNING"]
+
+    # Game clock ticks per second, and the most missed ticks replayed at once
+    TICK_RATE = 30
+    MAX_CATCHUP_TICKS = 15
+
+    # Clock tick at which the player's move is sampled
+    SHOOT_CLOCK = 60
+    # Ticks before and after SHOOT_CLOCK whose hand reads are voted on
+    VOTE_LEAD = 4
+    VOTE_LAG = 2
+    # Ticks before SHOOT_CLOCK from which hand tracking should run at full rate
+    FULL_RATE_LEAD = 10
+    # Tick at which the voted move is decided, and the first tick voted on
+    _DECIDE_CLOCK = SHOOT_CLOCK + VOTE_LAG
+    _VOTE_CLOCK = SHOOT_CLOCK - VOTE_LEAD
+    # A read repeated for longer than this many ticks (e.g. from a frozen
+    # camera) no longer counts as a hand in front of the camera
+    MAX_READ_AGE = VOTE_LEAD + VOTE_LAG
+
+    # Status text for each countdown phase, by clock tick
+    PHASE_TEXT = ["Rock"] * 30 + ["Paper"] * 10 + ["Scissors"] * 10 + ["Shoot!"] * 50
+
+    # Fields shared with the renderer live on the snapshot
+    game_state = _snapshot_field("game_state")
+    clock = _snapshot_field("clock")
+    player_move = _snapshot_field("player_move")
+    computer_move = _snapshot_field("computer_move")
+    round_number = _snapshot_field("round_number")
+    player_score = _snapshot_field("player_score")
+    computer_score = _snapshot_field("computer_score")
+    match_ended = _snapshot_field("match_ended")
+    game_text = _snapshot_field("game_text")
+
+    def __init__(self, vote_policy="majority", rng=None):
+        self._snapshot = GameSnapshot()
         self.game_state = self.GAME_STATES["STOPPED"]
         self.clock = 0
         self.player_move = None
@@ -25,99 +108,179 @@ class GameLogic:
         self.match_ended = False
         self.round_result_shown = False
         self.game_text = "Press Start to begin"  # Default status text
+        self.move_decided = False
+        self.voter = GestureVoter(policy=vote_policy)
+        self.rng = rng if rng is not None else random
+        self._player_code = NO_MOVE
+        self._computer_code = NO_MOVE
+        self._ready_text = (0, "")
+        self._pending_ticks = 0.0
+        self._read_age = 0
+
+    def _set_text(self, text):
+        """Update the status text, logging only when it actually changes."""
+        snapshot = self._snapshot
+        if text != snapshot.game_text:
+            snapshot.game_text = text
+            snapshot.version += 1
+            logger.debug("Updated game_text: %s", text)
 
     def start_game(self):
         """Start the game."""
         self.game_state = self.GAME_STATES["RUNNING"]
         self.game_text = "Game started!"
-        logging.debug(f"Game started, game_text: {self.game_text}")
+        logger.debug("Game started, game_text: %s", self.game_text)
 
     def stop_game(self):
         """Pause the game."""
         self.game_state = self.GAME_STATES["PAUSED"]
         self.game_text = "Game paused"
-        logging.debug(f"Game paused, game_text: {self.game_text}")
+        logger.debug("Game paused, game_text: %s", self.game_text)
 
     def restart_game(self):
         """Reset the game to initial state."""
         self.clock = 0
+        self._pending_ticks = 0.0
+        self._read_age = 0
         self.round_number = 1
         self.player_score = 0
         self.computer_score = 0
         self.match_ended = False
         self.round_result_shown = False
+        self.move_decided = False
+        self.voter.reset()
         self.game_text = "Press Start to begin"
         self.game_state = self.GAME_STATES["STOPPED"]
-        logging.debug(f"Game reset, game_text: {self.game_text}")
+        logger.debug("Game reset, game_text: %s", self.game_text)
 
     def get_computer_move(self):
         """Generate a random computer move."""
-        return random.choice(["rock", "paper", "scissors"])
+        return self.rng.choice(MOVES)
+
+    def advance(self, elapsed, player_move, success, confidence=1.0, fresh=True):
+        """Advance the game clock by elapsed seconds and apply the player's latest read.
+
+        Elapsed time is converted into whole ticks at TICK_RATE, carrying the
+        remainder over to the next call. Every tick is stepped through
+        update_game_state in order, so phases are never skipped when frames
+        arrive late; after a long stall at most MAX_CATCHUP_TICKS are replayed
+        and the rest is dropped. Pass ``fresh=False`` when repeating an earlier
+        read because no new frame came in; once it is more than MAX_READ_AGE
+        ticks old it is treated as no hand. Returns the number of ticks stepped.
+        """
+        self._pending_ticks += elapsed * self.TICK_RATE
+        # The epsilon absorbs float error, e.g. from adding up 1/30 s steps
+        ticks = int(self._pending_ticks + 1e-9)
+        self._pending_ticks -= ticks
+        if ticks > self.MAX_CATCHUP_TICKS:
+            logger.debug("Dropping %d game ticks after a stall", ticks - self.MAX_CATCHUP_TICKS)
+            ticks = self.MAX_CATCHUP_TICKS
 
-    def update_game_state(self, clock, player_move, success):
+        if fresh:
+            self._read_age = 0
+        else:
+            self._read_age += ticks
+            if self._read_age > self.MAX_READ_AGE:
+                success = False
+
+        # Hot path: read the snapshot directly instead of through properties
+        snapshot = self._snapshot
+        if not ticks:
+            self.update_game_state(snapshot.clock, player_move, success, confidence)
+        for _ in range(ticks):
+            clock = snapshot.clock
+            if snapshot.game_state == self._RUNNING and not snapshot.match_ended:
+                clock = (clock + 1) % 100
+            self.update_game_state(clock, player_move, success, confidence)
+        return ticks
+
+    def update_game_state(self, clock, player_move, success, confidence=1.0):
         """Update the game state based on the current clock and player move."""
-        self.clock = clock
-        if self.game_state == self.GAME_STATES["RUNNING"] and not self.match_ended:
-            if 0 <= self.clock < 20:
-                self.game_text = f"Round {self.round_number} - Get Ready!"
-                self.round_result_shown = False
-            elif self.clock < 30:
-                self.game_text = "Rock"
-            elif self.clock < 40:
-                self.game_text = "Paper"
-            elif self.clock < 50:
-                self.game_text = "Scissors"
-            elif self.clock < 60:
-                self.game_text = "Shoot!"
-            elif self.clock == 60:
-                if success:
-                    self.player_move = player_move
-                    self.computer_move = self.get_computer_move()
-                else:
-                    self.game_text = "Show exactly one hand!"
-            elif self.clock < 100 and not self.round_result_shown:
-                if success and self.player_move and self.computer_move:
-                    self.game_text = f"You: {self.player_move} | Computer: {self.computer_move}"
-                    if self.player_move == self.computer_move:
-                        self.game_text += " | Draw!"
-                    elif (self.player_move == "rock" and self.computer_move == "scissors") or \
-                         (self.player_move == "scissors" and self.computer_move == "paper") or \
-                         (self.player_move == "paper" and self.computer_move == "rock"):
-                        self.game_text += " | You win this round!"
-                        self.player_score += 1
-                    else:
-                        self.game_text += " | Computer wins this round!"
-                        self.computer_score += 1
-
-                    if self.player_score >= 2 or self.computer_score >= 2:
-                        self.match_ended = True
-                        self.game_state = self.GAME_STATES["PAUSED"]
-                        self.game_text = "You Win the Match!" if self.player_score > self.computer_score else "Computer Wins the Match!"
-
-                    self.round_result_shown = True
-
-                    if self.clock >= 90:
-                        self.clock = 0
-                        if not self.match_ended:
-                            self.round_number += 1
-                else:
-                    self.game_text = "Show exactly one hand!"
-            logging.debug(f"Updated game_text: {self.game_text}")
+        # Hot path: work on the snapshot directly instead of through properties
+        snapshot = self._snapshot
+        if snapshot.clock != clock:
+            snapshot.clock = clock
+            snapshot.version += 1
+        decide_clock = self._DECIDE_CLOCK
+        if snapshot.game_state != self._RUNNING or snapshot.match_ended:
+            if not snapshot.game_text:
+                self._set_text("Game paused or stopped")
+            return
+
+        # Only reads inside the vote window can affect the decision
+        if self._VOTE_CLOCK <= clock <= decide_clock:
+            self.voter.push(MOVE_CODES[player_move] if success else NO_MOVE, confidence, clock)
+
+        if 0 <= clock < 20:
+            if self._ready_text[0] != snapshot.round_number:
+                self._ready_text = (snapshot.round_number, f"Round {snapshot.round_number} - Get Ready!")
+            if self._ready_text[1] != snapshot.game_text:
+                self._set_text(self._ready_text[1])
+            self.round_result_shown = False
+            self.move_decided = False
+            if len(self.voter):
+                self.voter.reset()
+        elif clock < decide_clock:
+            text = self.PHASE_TEXT[clock]
+            if text != snapshot.game_text:
+                self._set_text(text)
+        elif clock == decide_clock:
+            if not self.move_decided:
+                self._decide_moves(decide_clock)
+        elif clock < 100 and not self.round_result_shown:
+            if self.move_decided:
+                self._resolve_round()
+            else:
+                self._set_text("Show exactly one hand!")
+
+    def _decide_moves(self, decide_clock):
+        """Pick the player's move from the voted reads and draw the computer's."""
+        move = self.voter.decide(self._VOTE_CLOCK, decide_clock)
+        if move == NO_MOVE:
+            self._set_text("Show exactly one hand!")
+            return
+        self._player_code = move
+        self._computer_code = MOVE_CODES[self.get_computer_move()]
+        self.player_move = MOVES[move]
+        self.computer_move = MOVES[self._computer_code]
+        self.move_decided = True
+
+    def _resolve_round(self):
+        """Score the decided round and check whether the match is over."""
+        snapshot = self._snapshot
+        outcome = OUTCOMES.item(self._player_code, self._computer_code)
+        if outcome == 1:
+            self.player_score += 1
+        elif outcome == -1:
+            self.computer_score += 1
+
+        if snapshot.player_score >= 2 or snapshot.computer_score >= 2:
+            self.match_ended = True
+            self.game_state = self.GAME_STATES["PAUSED"]
+            self._set_text("You Win the Match!" if snapshot.player_score > snapshot.computer_score
+                           else "Computer Wins the Match!")
         else:
-            if not self.game_text:
-                self.game_text = "Game paused or stopped"
-            logging.debug(f"Game not running, game_text: {self.game_text}")
+            self._set_text(f"You: {snapshot.player_move} | Computer: {snapshot.computer_move}"
+                           + ROUND_RESULT_TEXT[outcome])
+
+        self.round_result_shown = True
+
+        if snapshot.clock >= 90:
+            self.clock = 0
+            if not snapshot.match_ended:
+                self.round_number += 1
+
+    def is_sampling_move(self):
+        """Return True while the player's move is about to be or is being read."""
+        snapshot = self._snapshot
+        return (snapshot.game_state == self._RUNNING and not snapshot.match_ended
+                and self.SHOOT_CLOCK - self.FULL_RATE_LEAD <= snapshot.clock <= self._DECIDE_CLOCK
+                and not self.move_decided)
 
     def get_state(self):
-        """Return the current game state."""
-        return {
-            "game_state": self.game_state,
-            "clock": self.clock,
-            "player_move": self.player_move,
-            "computer_move": self.computer_move,
-            "round_number": self.round_number,
-            "player_score": self.player_score,
-            "computer_score": self.computer_score,
-            "match_ended": self.match_ended,
-            "game_text": self.game_text
-        }
\ No newline at end of file
+        """Return the current game state.
+
+        The same GameSnapshot is returned every time; it is kept up to date
+        in place and its version changes whenever one of its fields does.
+        """
+        return self._snapshot
@@ -0,0 +1,143 @@
+"""Vectorized rock/paper/scissors classification of packed hand landmarks.
+
+Landmarks are float arrays shaped (21, 3) for one hand or (N, 21, 3) for a
+batch, holding MediaPipe's normalized (x, y, z) per hand landmark.
+"""
+from array import array
+
+import numpy as np
+
+MOVES = ("rock", "paper", "scissors")
+ROCK, PAPER, SCISSORS = range(3)
+NO_MOVE = -1
+
+# Round outcome from the player's point of view, indexed [player, computer]:
+# 1 = player wins, -1 = computer wins, 0 = draw
+OUTCOMES = np.array([
+    [0, -1, 1],   # rock vs rock, paper, scissors
+    [1, 0, -1],   # paper
+    [-1, 1, 0],   # scissors
+], dtype=np.int8)
+
+# MediaPipe hand landmark indices
+WRIST = 0
+THUMB_IP = 3
+THUMB_TIP = 4
+FINGER_PIPS = np.array([6, 10, 14, 18])  # index, middle, ring, pinky
+FINGER_TIPS = np.array([8, 12, 16, 20])
+
+NUM_LANDMARKS = 21
+
+
+def finger_extension(landmarks, threshold=0.05):
+    """Return a (..., 5) bool array: thumb, index, middle, ring, pinky extended."""
+    points = np.asarray(landmarks)
+    # Compare in double precision so results match scalar Python floats exactly
+    x = points[..., 0].astype(np.float64)
+    y = points[..., 1].astype(np.float64)
+
+    fingers = y[..., FINGER_TIPS] < y[..., FINGER_PIPS] - threshold
+
+    thumb_tip_x = x[..., THUMB_TIP]
+    thumb_ip_x = x[..., THUMB_IP]
+    is_right_hand = thumb_tip_x > x[..., WRIST]
+    thumb = np.where(is_right_hand, thumb_tip_x > thumb_ip_x, thumb_tip_x < thumb_ip_x)
+
+    return np.concatenate([thumb[..., np.newaxis], fingers], axis=-1)
+
+
+def classify_landmarks(landmarks, threshold=0.05):
+    """Classify hands into ROCK, PAPER or SCISSORS codes.
+
+    Returns an int for a single (21, 3) hand and an int8 array of length N
+    for an (N, 21, 3) batch.
+    """
+    extended = finger_extension(landmarks, threshold)[..., 1:]
+    index, middle, ring, pinky = np.moveaxis(extended, -1, 0)
+
+    codes = np.full(extended.shape[:-1], PAPER, dtype=np.int8)
+    codes[~extended.any(axis=-1)] = ROCK
+    codes[index & middle & ~ring & ~pinky] = SCISSORS
+    return int(codes) if codes.ndim == 0 else codes
+
+
+def move_names(codes):
+    """Map move codes back to their names."""
+    if np.ndim(codes) == 0:
+        return MOVES[int(codes)]
+    return [MOVES[code] for code in np.asarray(codes).tolist()]
+
+
+class GestureVoter:
+    """Fixed-size ring buffer of per-frame move reads with a voting policy.
+
+    Each frame records a move code (NO_MOVE when exactly one hand was not
+    seen), its confidence and the game clock tick it was read at. Pushing is
+    O(1); ``decide`` picks a move from the reads inside a tick window using
+    either a confidence-weighted majority or an exponential moving average.
+    With the default ``ema_alpha`` a single stray read cannot outvote a run
+    of several consistent ones. Ties go to the move that was read last.
+    """
+
+    POLICIES = ("majority", "ema")
+
+    def __init__(self, size=32, policy="majority", ema_alpha=0.2):
+        if policy not in self.POLICIES:
+            raise ValueError(f"policy must be one of {self.POLICIES}, got {policy!r}")
+        self.size = size
+        self.policy = policy
+        self.ema_alpha = ema_alpha
+        # Plain typed arrays keep push cheap; NumPy views over the same
+        # memory are used when voting
+        self._codes = array("b", [NO_MOVE]) * size
+        self._confidences = array("f", [0.0]) * size
+        self._ticks = array("i", [0]) * size
+        self.codes = np.frombuffer(self._codes, dtype=np.int8)
+        self.confidences = np.frombuffer(self._confidences, dtype=np.float32)
+        self.ticks = np.frombuffer(self._ticks, dtype=np.int32)
+        self._head = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def reset(self):
+        """Forget all recorded reads."""
+        self._head = 0
+        self._count = 0
+
+    def push(self, code, confidence, tick):
+        """Record one frame's read, overwriting the oldest when full."""
+        i = self._head
+        self._codes[i] = code
+        self._confidences[i] = confidence
+        self._ticks[i] = tick
+        self._head = (i + 1) % self.size
+        if self._count < self.size:
+            self._count += 1
+
+    def decide(self, first_tick, last_tick):
+        """Return the winning move code for reads in [first_tick, last_tick], or NO_MOVE."""
+        # Reads in chronological order
+        order = np.arange(self._head - self._count, self._head) % self.size
+        ticks = self.ticks[order]
+        order = order[(ticks >= first_tick) & (ticks <= last_tick)]
+        codes = self.codes[order]
+        valid = codes != NO_MOVE
+        if not valid.any():
+            return NO_MOVE
+
+        if self.policy == "majority":
+            scores = np.bincount(codes[valid], weights=self.confidences[order][valid], minlength=len(MOVES))
+        else:
+            # Later reads weigh more: weight = alpha * (1 - alpha) ** age
+            ages = np.arange(len(order) - 1, -1, -1)
+            weights = self.ema_alpha * (1 - self.ema_alpha) ** ages * self.confidences[order]
+            scores = np.bincount(codes[valid], weights=weights[valid], minlength=len(MOVES))
+        tied = np.flatnonzero(np.isclose(scores, scores.max()))
+        if len(tied) == 1:
+            return int(tied[0])
+        # Break ties by recency rather than by move order
+        for code in codes[valid][::-1]:
+            if code in tied:
+                return int(code)
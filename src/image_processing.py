@@ -1,87 +1,234 @@
+import logging
+import threading
+
 import cv2 as cv
-import mediapipe as mp
 import numpy as np
+from capture import open_source
+from frame_pool import FramePool
+from gestures import FINGER_PIPS, FINGER_TIPS, NUM_LANDMARKS
+from profiler import profiler
+
+# MediaPipe takes longer to import than everything else put together, so it
+# is only loaded when a model or its drawing helpers are first needed
+_mp_solutions = None
+
+def mp_solutions():
+    """Return mediapipe.solutions, importing MediaPipe on first use."""
+    global _mp_solutions
+    if _mp_solutions is None:
+        import mediapipe as mp
+        _mp_solutions = mp.solutions
+    return _mp_solutions
+
+def __getattr__(name):
+    # Keep `from image_processing import mp_hands` working without an eager import
+    if name == "mp_hands":
+        return mp_solutions().hands
+    if name == "mp_drawing":
+        return mp_solutions().drawing_utils
+    if name == "mp_drawing_styles":
+        return mp_solutions().drawing_styles
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def landmarks_to_array(multi_hand_landmarks):
+    """Pack MediaPipe hand landmarks into a float32 (N, 21, 3) array."""
+    if not multi_hand_landmarks:
+        return np.empty((0, NUM_LANDMARKS, 3), dtype=np.float32)
+    return np.array([[(lm.x, lm.y, lm.z) for lm in hand.landmark] for hand in multi_hand_landmarks],
+                    dtype=np.float32)
+
+def draw_landmark_array(frame, hands, color=(0, 255, 0)):
+    """Draw packed (N, 21, 3) normalized hand landmarks on a BGR frame."""
+    h, w = frame.shape[:2]
+    for hand in hands:
+        points = [(int(x * w), int(y * h)) for x, y, _ in hand.tolist()]
+        for start, end in mp_solutions().hands.HAND_CONNECTIONS:
+            cv.line(frame, points[start], points[end], (255, 255, 255), 2)
+        for point in points:
+            cv.circle(frame, point, 3, color, -1)
+    return frame
+
+def make_hands(static_image_mode=False, max_hands=2, warm_up=None):
+    """Create a MediaPipe Hands model with the game's settings.
+
+    ``static_image_mode`` treats frames as unrelated images instead of a
+    tracked stream. With a ``warm_up`` RGB image one inference is run
+    straight away, as the first is much slower than the rest.
+    """
+    hands = mp_solutions().hands.Hands(
+        static_image_mode=static_image_mode,
+        max_num_hands=max_hands,
+        model_complexity=0,
+        min_detection_confidence=0.7,
+        min_tracking_confidence=0.7
+    )
+    if warm_up is not None:
+        hands.process(warm_up)
+    return hands
+
+# (pip, tip) landmark indices of the index, middle, ring and pinky fingers
+FINGER_JOINTS = tuple(zip(FINGER_PIPS.tolist(), FINGER_TIPS.tolist()))
+
+def classify_hand(hand_landmarks, threshold=0.05):
+    """Detect the hand gesture (rock, paper, scissors) of a single hand.
 
-# Initialize MediaPipe Hands
-mp_drawing = mp.solutions.drawing_utils
-mp_drawing_styles = mp.solutions.drawing_styles
-mp_hands = mp.solutions.hands
+    Reads only the eight finger landmarks involved, which is much cheaper
+    per frame than packing the hand for gestures.classify_landmarks; the
+    result is the same. Use classify_landmarks for batches.
+    """
+    landmark = hand_landmarks.landmark
+    index, middle, ring, pinky = [landmark[tip].y < landmark[pip].y - threshold for pip, tip in FINGER_JOINTS]
+    if index and middle and not ring and not pinky:
+        return "scissors"
+    if index or middle or ring or pinky:
+        return "paper"
+    return "rock"
 
 class ImageProcessor:
-    def __init__(self, video_width=640, video_height=480):
+    def __init__(self, video_width=640, video_height=480, idle_stride=3, source=0, capture_fps=30,
+                 inference_scale=1.0, show_landmarks=True, background=False, hands=None):
         self.video_width = video_width
         self.video_height = video_height
-        self.vid = cv.VideoCapture(0)
-        self.hands = mp_hands.Hands(
-            model_complexity=0,
-            min_detection_confidence=0.7,
-            min_tracking_confidence=0.7
-        )
+        # Run inference on every frame only while a move is about to be read;
+        # otherwise on every idle_stride-th frame, reusing the last results
+        self.idle_stride = idle_stride
+        self.full_rate = True
+        self._last_results = None
+        self._frames_skipped = 0
+        # Quality knobs (see quality.py): frames are shrunk by inference_scale
+        # before MediaPipe, which returns normalized landmarks either way
+        self.inference_scale = inference_scale
+        self.show_landmarks = show_landmarks
+        # Reused buffers: raw camera read, mirrored frame, and the RGB copy
+        # MediaPipe needs. Output frames come from a pool and are handed back
+        # with release_frame once displayed.
+        self.frame_pool = FramePool((video_height, video_width, 3))
+        self._raw = None
+        self._flipped = None
+        self._rgb = np.zeros((video_height, video_width, 3), dtype=np.uint8)
+        self._small = None
+        self._rgb_small = None
+
+        # The capture source and the model are set up by _load, on a
+        # background thread when requested so a UI can be shown meanwhile.
+        # A ready-made ``hands`` (anything with process/close, e.g. canned
+        # results for benchmarks) replaces the MediaPipe model
+        self.vid = None
+        self.hands = hands
+        self._source = (source, capture_fps)
+        self._ready = threading.Event()
+        self._load_error = None
+        if background:
+            threading.Thread(target=self._load, name="image-processor-load", daemon=True).start()
+        else:
+            self._load()
+            self.wait_ready()
+
+    def _load(self):
+        """Open the capture source and load the model, overlapping the two."""
+        try:
+            opener = threading.Thread(target=self._open_capture, name="capture-open", daemon=True)
+            opener.start()
+            if self.hands is None:
+                self._load_model()
+            opener.join()
+        except Exception as exc:
+            self._load_error = self._load_error or exc
+        finally:
+            self._ready.set()
+
+    def _open_capture(self):
+        try:
+            # Cameras are asked for the display size up front so most need no
+            # resize; see capture.open_source for the accepted sources
+            source, capture_fps = self._source
+            self.vid = open_source(source, self.video_width, self.video_height, capture_fps)
+        except Exception as exc:
+            self._load_error = exc
+
+    def _load_model(self):
+        self.hands = make_hands(warm_up=self._rgb)
+        logging.debug("Hand tracking model loaded")
+
+    @property
+    def ready(self):
+        """True once the source is open and the model warmed up without error."""
+        return self._ready.is_set() and self._load_error is None
+
+    def wait_ready(self, timeout=None):
+        """Wait until the source is open and the model warmed up; re-raise any failure."""
+        if not self._ready.wait(timeout):
+            return False
+        if self._load_error is not None:
+            raise self._load_error
+        return True
 
     def capture_frame(self):
-        """Capture and preprocess a frame from the webcam."""
-        ret, frame = self.vid.read()
+        """Capture and preprocess a frame from the capture source."""
+        with profiler.span("capture.read"):
+            ret, self._raw = self.vid.read(self._raw)
         if not ret:
             return None
-        frame = cv.flip(frame, 1)
-        frame = cv.resize(frame, (self.video_width, self.video_height))
+        frame = self.frame_pool.acquire()
+        with profiler.span("capture.flip"):
+            if self._raw.shape == frame.shape:
+                cv.flip(self._raw, 1, dst=frame)
+            else:
+                self._flipped = cv.flip(self._raw, 1, dst=self._flipped)
+                cv.resize(self._flipped, (self.video_width, self.video_height), dst=frame)
         return frame
 
+    def release_frame(self, frame):
+        """Hand a frame from capture_frame back for reuse."""
+        self.frame_pool.release(frame)
+
     def process_hands(self, frame):
         """Process the frame to detect hands using MediaPipe."""
-        rgb_frame = cv.cvtColor(frame, cv.COLOR_BGR2RGB)
-        results = self.hands.process(rgb_frame)
+        if (not self.full_rate and self._last_results is not None
+                and self._frames_skipped < self.idle_stride - 1):
+            self._frames_skipped += 1
+            return self._last_results
+        with profiler.span("inference.mediapipe"):
+            results = self.hands.process(self._rgb_input(frame))
+        self._last_results = results
+        self._frames_skipped = 0
         return results
 
+    def _rgb_input(self, frame):
+        """Return the frame as RGB at inference_scale, reusing buffers where possible."""
+        if self.inference_scale != 1.0:
+            size = (max(1, round(frame.shape[1] * self.inference_scale)),
+                    max(1, round(frame.shape[0] * self.inference_scale)))
+            shape = (size[1], size[0], 3)
+            if self._small is None or self._small.shape != shape:
+                self._small = np.empty(shape, dtype=np.uint8)
+                self._rgb_small = np.empty(shape, dtype=np.uint8)
+            cv.resize(frame, size, dst=self._small, interpolation=cv.INTER_AREA)
+            return cv.cvtColor(self._small, cv.COLOR_BGR2RGB, dst=self._rgb_small)
+        if frame.shape == self._rgb.shape:
+            return cv.cvtColor(frame, cv.COLOR_BGR2RGB, dst=self._rgb)
+        return cv.cvtColor(frame, cv.COLOR_BGR2RGB)
+
     def draw_landmarks(self, frame, results):
         """Draw hand landmarks on the frame."""
-        if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                mp_drawing.draw_landmarks(
-                    frame,
-                    hand_landmarks,
-                    mp_hands.HAND_CONNECTIONS,
-                    mp_drawing_styles.get_default_hand_landmarks_style(),
-                    mp_drawing_styles.get_default_hand_connections_style()
-                )
+        if results.multi_hand_landmarks and self.show_landmarks:
+            with profiler.span("inference.draw"):
+                solutions = mp_solutions()
+                for hand_landmarks in results.multi_hand_landmarks:
+                    solutions.drawing_utils.draw_landmarks(
+                        frame,
+                        hand_landmarks,
+                        solutions.hands.HAND_CONNECTIONS,
+                        solutions.drawing_styles.get_default_hand_landmarks_style(),
+                        solutions.drawing_styles.get_default_hand_connections_style()
+                    )
         return frame
 
     def get_hand_move(self, hand_landmarks):
         """Detect the hand gesture (rock, paper, scissors)."""
-        landmarks = hand_landmarks.landmark
-        threshold = 0.05
-
-        # Get finger positions
-        index_tip = landmarks[mp_hands.HandLandmark.INDEX_FINGER_TIP].y
-        index_pip = landmarks[mp_hands.HandLandmark.INDEX_FINGER_PIP].y
-        middle_tip = landmarks[mp_hands.HandLandmark.MIDDLE_FINGER_TIP].y
-        middle_pip = landmarks[mp_hands.HandLandmark.MIDDLE_FINGER_PIP].y
-        ring_tip = landmarks[mp_hands.HandLandmark.RING_FINGER_TIP].y
-        ring_pip = landmarks[mp_hands.HandLandmark.RING_FINGER_PIP].y
-        pinky_tip = landmarks[mp_hands.HandLandmark.PINKY_TIP].y
-        pinky_pip = landmarks[mp_hands.HandLandmark.PINKY_PIP].y
-        thumb_tip_x = landmarks[mp_hands.HandLandmark.THUMB_TIP].x
-        thumb_ip_x = landmarks[mp_hands.HandLandmark.THUMB_IP].x
-        wrist_x = landmarks[mp_hands.HandLandmark.WRIST].x
-
-        # Check if thumb is extended
-        is_right_hand = thumb_tip_x > wrist_x
-        thumb_extended = (thumb_tip_x > thumb_ip_x) if is_right_hand else (thumb_tip_x < thumb_ip_x)
-
-        # Check which fingers are extended
-        index_extended = index_tip < index_pip - threshold
-        middle_extended = middle_tip < middle_pip - threshold
-        ring_extended = ring_tip < ring_pip - threshold
-        pinky_extended = pinky_tip < pinky_pip - threshold
-
-        # Gesture detection
-        if not index_extended and not middle_extended and not ring_extended and not pinky_extended:
-            return "rock"
-        elif index_extended and middle_extended and not ring_extended and not pinky_extended:
-            return "scissors"
-        else:
-            return "paper"
+        return classify_hand(hand_landmarks)
 
     def release(self):
         """Release the video capture."""
-        self.vid.release()
\ No newline at end of file
+        if self.vid is not None:
+            self.vid.release()
\ No newline at end of file
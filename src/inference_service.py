@@ -0,0 +1,271 @@
+"""Shared MediaPipe Hands inference on a fixed pool of worker processes.
+
+Frames are copied into shared-memory slots instead of being pickled, and
+each worker writes its detections back into shared memory as packed
+(max_hands, 21, 3) landmark arrays. Pending requests are handed to idle
+workers earliest-deadline-first; requests whose deadline has passed before
+a worker became free are failed with TimeoutError instead of being run.
+A worker process that dies fails its in-flight request with RuntimeError
+and is not used again.
+"""
+import heapq
+import itertools
+import logging
+import multiprocessing
+import queue
+import signal
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+
+import cv2 as cv
+import numpy as np
+
+from gestures import NUM_LANDMARKS
+
+
+def _attach(name, shape, dtype):
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _worker_main(worker_id, tasks, results, names, frame_shape, slots, max_hands):
+    """Worker process: load and warm up the model, then serve slots until told to stop."""
+    from image_processing import landmarks_to_array, make_hands
+
+    # Ctrl+C reaches the whole process group; the parent stops workers via close()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    frame_shm, frames = _attach(names[0], (slots,) + frame_shape, np.uint8)
+    landmark_shm, landmarks = _attach(names[1], (slots, max_hands, NUM_LANDMARKS, 3), np.float32)
+    score_shm, scores = _attach(names[2], (slots, max_hands), np.float32)
+    rgb = np.empty(frame_shape, dtype=np.uint8)
+    hands = make_hands(static_image_mode=True, max_hands=max_hands, warm_up=rgb)
+    results.put(("ready", worker_id, None, 0))
+
+    try:
+        while True:
+            slot = tasks.get()
+            if slot is None:
+                break
+            cv.cvtColor(frames[slot], cv.COLOR_BGR2RGB, dst=rgb)
+            detected = hands.process(rgb)
+            count = 0
+            if detected.multi_hand_landmarks:
+                count = min(len(detected.multi_hand_landmarks), max_hands)
+                landmarks[slot, :count] = landmarks_to_array(detected.multi_hand_landmarks[:count])
+                scores[slot, :count] = [h.classification[0].score for h in detected.multi_handedness[:count]]
+            results.put(("done", worker_id, slot, count))
+    finally:
+        hands.close()
+        del frames, landmarks, scores
+        for shm in (frame_shm, landmark_shm, score_shm):
+            shm.close()
+
+
+class InferenceService:
+    """Fixed pool of pre-warmed MediaPipe Hands worker processes.
+
+    ``detect`` returns a Future resolving to ``(landmarks, scores)``: a
+    float32 (N, 21, 3) array of normalized landmarks and an (N,) array of
+    handedness scores. All frames must have the shape given at construction.
+    """
+
+    def __init__(self, workers=2, frame_shape=(480, 640, 3), slots_per_worker=2, max_hands=2,
+                 default_timeout=0.5):
+        self.frame_shape = tuple(frame_shape)
+        self.max_hands = max_hands
+        self.default_timeout = default_timeout
+        slots = workers * slots_per_worker
+
+        # Shared buffers, one entry per slot
+        self._shms = [
+            shared_memory.SharedMemory(create=True, size=slots * int(np.prod(self.frame_shape))),
+            shared_memory.SharedMemory(create=True, size=slots * max_hands * NUM_LANDMARKS * 3 * 4),
+            shared_memory.SharedMemory(create=True, size=slots * max_hands * 4),
+        ]
+        self._frames = np.ndarray((slots,) + self.frame_shape, dtype=np.uint8, buffer=self._shms[0].buf)
+        self._landmarks = np.ndarray((slots, max_hands, NUM_LANDMARKS, 3), dtype=np.float32, buffer=self._shms[1].buf)
+        self._scores = np.ndarray((slots, max_hands), dtype=np.float32, buffer=self._shms[2].buf)
+        self._free_slots = queue.Queue()
+        for slot in range(slots):
+            self._free_slots.put(slot)
+
+        # Worker processes, each with its own task queue so the dispatcher
+        # decides which request runs where
+        ctx = multiprocessing.get_context("spawn")
+        self._results = ctx.Queue()
+        self._tasks = [ctx.Queue() for _ in range(workers)]
+        names = [shm.name for shm in self._shms]
+        self._workers = [
+            ctx.Process(target=_worker_main, name=f"hands-{i}", daemon=True,
+                        args=(i, self._tasks[i], self._results, names, self.frame_shape, slots, max_hands))
+            for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+        # Earliest-deadline-first queue of (deadline, seq, slot, future)
+        self._pending = []
+        self._seq = itertools.count()
+        self._idle = []
+        self._in_flight = {}
+        # worker_id -> slot it is working on, to fail the request if it dies
+        self._busy = {}
+        self._dead = set()
+        self._cond = threading.Condition()
+        self._running = True
+        self._ready = threading.Event()
+        self._threads = [
+            threading.Thread(target=self._dispatch_loop, name="inference-dispatch", daemon=True),
+            threading.Thread(target=self._collect_loop, name="inference-collect", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def closed(self):
+        return not self._running
+
+    def wait_ready(self, timeout=None):
+        """Block until every worker has loaded and warmed up its model."""
+        return self._ready.wait(timeout)
+
+    def detect(self, frame, deadline=None):
+        """Queue a BGR frame for hand detection and return a Future.
+
+        ``deadline`` is a time.monotonic() timestamp; it defaults to
+        default_timeout seconds from now. Blocks while every slot is busy;
+        raises RuntimeError once the service is closed or has no workers left.
+        """
+        if frame.shape != self.frame_shape:
+            raise ValueError(f"Expected a frame of shape {self.frame_shape}, got {frame.shape}")
+        if deadline is None:
+            deadline = time.monotonic() + self.default_timeout
+        slot = None
+        while slot is None:
+            self._check_usable()
+            try:
+                slot = self._free_slots.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        future = Future()
+        with self._cond:
+            # Under the lock so close() cannot free the buffers mid-copy
+            self._check_usable()
+            np.copyto(self._frames[slot], frame)
+            heapq.heappush(self._pending, (deadline, next(self._seq), slot, future))
+            self._cond.notify_all()
+        return future
+
+    def _check_usable(self):
+        if not self._running:
+            raise RuntimeError("InferenceService is closed")
+        if len(self._dead) == len(self._workers):
+            raise RuntimeError("Every inference worker has exited")
+
+    def _dispatch_loop(self):
+        while True:
+            with self._cond:
+                while self._running and not (self._pending and self._idle):
+                    self._cond.wait()
+                if not self._running:
+                    break
+                deadline, _, slot, future = heapq.heappop(self._pending)
+                if deadline < time.monotonic():
+                    expired = True
+                else:
+                    expired = False
+                    worker_id = self._idle.pop()
+                    self._in_flight[slot] = future
+                    self._busy[worker_id] = slot
+            if expired:
+                self._free_slots.put(slot)
+                future.set_exception(TimeoutError("Deadline passed before a worker was free"))
+            else:
+                self._tasks[worker_id].put(slot)
+
+    def _collect_loop(self):
+        warm = set()
+        last_reap = time.monotonic()
+        while self._running:
+            # A crashed worker never reports back, so check on them regularly
+            if time.monotonic() - last_reap >= 0.1:
+                self._reap_workers(warm)
+                last_reap = time.monotonic()
+            try:
+                kind, worker_id, slot, count = self._results.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if kind == "done":
+                landmarks = self._landmarks[slot, :count].copy()
+                scores = self._scores[slot, :count].copy()
+            with self._cond:
+                if worker_id in self._dead:
+                    # Its request was already failed when the worker was reaped
+                    continue
+                self._idle.append(worker_id)
+                self._busy.pop(worker_id, None)
+                future = self._in_flight.pop(slot, None) if kind == "done" else None
+                self._cond.notify_all()
+            if kind == "ready":
+                warm.add(worker_id)
+                if len(warm | self._dead) == len(self._workers):
+                    self._ready.set()
+                continue
+            self._free_slots.put(slot)
+            if future is not None:
+                future.set_result((landmarks, scores))
+
+    def _reap_workers(self, warm):
+        """Fail the request of any worker process that has died and stop using it."""
+        for worker_id, worker in enumerate(self._workers):
+            if worker_id in self._dead or worker.is_alive():
+                continue
+            with self._cond:
+                if not self._running:
+                    return
+                self._dead.add(worker_id)
+                if worker_id in self._idle:
+                    self._idle.remove(worker_id)
+                slot = self._busy.pop(worker_id, None)
+                future = self._in_flight.pop(slot, None) if slot is not None else None
+                stranded = []
+                if len(self._dead) == len(self._workers):
+                    # Nothing is left to run the queue
+                    stranded, self._pending = self._pending, []
+            logging.error("Inference worker %s exited with code %s", worker.name, worker.exitcode)
+            if future is not None:
+                self._free_slots.put(slot)
+                future.set_exception(RuntimeError(f"Inference worker {worker.name} exited"))
+            for _, _, pending_slot, pending_future in stranded:
+                self._free_slots.put(pending_slot)
+                pending_future.set_exception(RuntimeError("Every inference worker has exited"))
+            # Don't leave wait_ready() blocked on a worker that never came up
+            if len(warm | self._dead) == len(self._workers):
+                self._ready.set()
+
+    def close(self):
+        """Stop the workers and release the shared memory; safe to call more than once."""
+        with self._cond:
+            if not self._running:
+                return
+            self._running = False
+            self._cond.notify_all()
+            pending, self._pending = self._pending, []
+            in_flight, self._in_flight = self._in_flight, {}
+        for future in [entry[3] for entry in pending] + list(in_flight.values()):
+            future.cancel()
+        for tasks in self._tasks:
+            tasks.put(None)
+        for worker in self._workers:
+            worker.join(timeout=5.0)
+            if worker.is_alive():
+                logging.warning("Inference worker %s did not exit, terminating it", worker.name)
+                worker.terminate()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        del self._frames, self._landmarks, self._scores
+        for shm in self._shms:
+            shm.close()
+            shm.unlink()
@@ -0,0 +1,163 @@
+"""Classify hand gestures offline from recorded throws.
+
+Inputs can be video files, directories of images or ``.npy`` arrays of
+pre-extracted landmarks shaped (N, 21, 3) (rows of NaN mean "no hand").
+Each input is split into chunks that are decoded and classified on a
+process pool, and one CSV row is written per frame.
+
+Usage: python offline.py INPUT [INPUT ...] -o labels.csv [--workers N]
+"""
+import argparse
+import collections
+import csv
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2 as cv
+import numpy as np
+
+from capture import ImageSequenceSource
+from gestures import classify_landmarks, move_names
+from image_processing import classify_hand
+
+CSV_FIELDS = ("source", "frame", "hands", "label", "decode_ms", "inference_ms")
+
+# Per-worker MediaPipe model, created on first use
+_hands = None
+
+
+def _get_hands():
+    global _hands
+    if _hands is None:
+        from image_processing import make_hands
+        # Chunks are classified out of order, so frames are treated as
+        # independent images rather than a tracked video stream
+        _hands = make_hands(static_image_mode=True)
+    return _hands
+
+
+def _classify_frame(frame, flip, threshold):
+    """Run MediaPipe on a BGR frame and return (hands, label, inference_ms)."""
+    start = time.perf_counter()
+    if flip:
+        frame = cv.flip(frame, 1)
+    results = _get_hands().process(cv.cvtColor(frame, cv.COLOR_BGR2RGB))
+    hands = len(results.multi_hand_landmarks) if results.multi_hand_landmarks else 0
+    label = classify_hand(results.multi_hand_landmarks[0], threshold) if hands == 1 else ""
+    return hands, label, (time.perf_counter() - start) * 1000
+
+
+def _run_video_chunk(path, start, stop, flip, threshold):
+    rows = []
+    vid = cv.VideoCapture(path)
+    vid.set(cv.CAP_PROP_POS_FRAMES, start)
+    for index in range(start, stop):
+        t0 = time.perf_counter()
+        ret, frame = vid.read()
+        decode_ms = (time.perf_counter() - t0) * 1000
+        if not ret:
+            break
+        hands, label, inference_ms = _classify_frame(frame, flip, threshold)
+        rows.append((path, index, hands, label, decode_ms, inference_ms))
+    vid.release()
+    return rows
+
+
+def _run_image_chunk(paths, start, flip, threshold):
+    rows = []
+    for index, path in enumerate(paths, start):
+        t0 = time.perf_counter()
+        frame = cv.imread(path)
+        decode_ms = (time.perf_counter() - t0) * 1000
+        if frame is None:
+            logging.warning("Could not read image %s", path)
+            continue
+        hands, label, inference_ms = _classify_frame(frame, flip, threshold)
+        rows.append((path, index, hands, label, decode_ms, inference_ms))
+    return rows
+
+
+def _run_landmark_chunk(path, start, stop, threshold):
+    t0 = time.perf_counter()
+    points = np.asarray(np.load(path, mmap_mode="r")[start:stop], dtype=np.float32)
+    has_hand = ~np.isnan(points).any(axis=(1, 2))
+    labels = move_names(classify_landmarks(points, threshold))
+    # The whole chunk is classified at once, so report the per-frame average
+    inference_ms = (time.perf_counter() - t0) * 1000 / max(len(points), 1)
+    return [(path, index, int(hand), label if hand else "", 0.0, inference_ms)
+            for index, hand, label in zip(range(start, stop), has_hand.tolist(), labels)]
+
+
+def _run_job(job):
+    kind, args = job
+    if kind == "video":
+        return _run_video_chunk(*args)
+    if kind == "images":
+        return _run_image_chunk(*args)
+    return _run_landmark_chunk(*args)
+
+
+def plan_jobs(inputs, chunk_size=256, flip=False, threshold=0.05):
+    """Split the inputs into chunks of at most chunk_size frames."""
+    jobs = []
+    for path in inputs:
+        if os.path.isdir(path):
+            images = ImageSequenceSource.from_pattern(path, realtime=False).paths
+            for start in range(0, len(images), chunk_size):
+                jobs.append(("images", (images[start:start + chunk_size], start, flip, threshold)))
+        elif path.endswith(".npy"):
+            count = len(np.load(path, mmap_mode="r"))
+            for start in range(0, count, chunk_size):
+                jobs.append(("landmarks", (path, start, min(start + chunk_size, count), threshold)))
+        else:
+            vid = cv.VideoCapture(path)
+            if not vid.isOpened():
+                raise ValueError(f"Cannot open video {path}")
+            count = int(vid.get(cv.CAP_PROP_FRAME_COUNT))
+            vid.release()
+            for start in range(0, count, chunk_size):
+                jobs.append(("video", (path, start, min(start + chunk_size, count), flip, threshold)))
+    return jobs
+
+
+def run_batch(inputs, output, workers=None, chunk_size=256, flip=False, threshold=0.05):
+    """Classify every frame of the inputs and write one CSV row per frame.
+
+    Returns a Counter of labels ("" for frames without exactly one hand).
+    """
+    jobs = plan_jobs(inputs, chunk_size, flip, threshold)
+    counts = collections.Counter()
+    with open(output, "w", newline="") as f, ProcessPoolExecutor(max_workers=workers) as pool:
+        writer = csv.writer(f)
+        writer.writerow(CSV_FIELDS)
+        for rows in pool.map(_run_job, jobs):
+            for source, index, hands, label, decode_ms, inference_ms in rows:
+                writer.writerow((source, index, hands, label, f"{decode_ms:.3f}", f"{inference_ms:.3f}"))
+                counts[label] += 1
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Classify hand gestures in recorded videos, images or landmark arrays.")
+    parser.add_argument("inputs", nargs="+", help="video files, image directories or .npy landmark arrays")
+    parser.add_argument("-o", "--output", default="labels.csv", help="CSV file to write per-frame labels to")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=256, help="frames per job")
+    parser.add_argument("--flip", action="store_true", help="mirror frames like the live camera feed")
+    parser.add_argument("--threshold", type=float, default=0.05, help="finger extension threshold")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = run_batch(args.inputs, args.output, args.workers, args.chunk_size, args.flip, args.threshold)
+    elapsed = time.perf_counter() - start
+    total = sum(counts.values())
+    logging.info("Classified %d frames in %.1fs (%.1f fps): %s", total, elapsed,
+                 total / elapsed if elapsed else 0.0,
+                 ", ".join(f"{label or 'no hand'}={n}" for label, n in counts.most_common()))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
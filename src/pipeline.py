@@ -0,0 +1,187 @@
+import collections
+import logging
+import threading
+import time
+
+
+class LatestFrameQueue:
+    """Bounded hand-off queue that drops the oldest item when full.
+
+    ``on_drop`` is called with each discarded item, outside the lock.
+    """
+
+    def __init__(self, maxsize=1, on_drop=None):
+        self.maxsize = maxsize
+        self.on_drop = on_drop
+        self.dropped = 0
+        self._items = collections.deque()
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def put(self, item):
+        """Queue an item, discarding the stalest one if the queue is full."""
+        stale = None
+        with self._cond:
+            if len(self._items) >= self.maxsize:
+                stale = self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+        if stale is not None and self.on_drop is not None:
+            self.on_drop(stale)
+
+    def get(self, timeout=None):
+        """Return the oldest queued item, or None on timeout or close."""
+        with self._cond:
+            if not self._items and not self._closed:
+                self._cond.wait(timeout)
+            if self._items:
+                return self._items.popleft()
+            return None
+
+    def close(self):
+        """Wake up any waiting consumer; further gets return None once drained."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __len__(self):
+        return len(self._items)
+
+    @property
+    def closed(self):
+        return self._closed
+
+
+class StageStats:
+    """Running timing counters for one pipeline stage."""
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.total = 0.0
+        self.last = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def __str__(self):
+        return (f"{self.name}: n={self.count} mean={self.mean * 1000:.1f}ms "
+                f"last={self.last * 1000:.1f}ms max={self.max * 1000:.1f}ms")
+
+
+class FramePacket:
+    """A captured frame travelling through the pipeline."""
+    __slots__ = ("frame", "results", "captured_at", "inferred_at")
+
+    def __init__(self, frame, captured_at):
+        self.frame = frame
+        self.results = None
+        self.captured_at = captured_at
+        self.inferred_at = None
+
+
+class Pipeline:
+    """Run capture and hand inference on their own threads.
+
+    Capture and inference hand frames off through latest-frame-wins queues,
+    so a slow stage drops stale frames instead of building up a backlog.
+    Rendering stays on the caller's thread (HighGUI must be driven from the
+    main thread) and reports back through ``mark_rendered``/``mark_shown``.
+    """
+
+    STAGES = ("capture", "inference", "render", "end_to_end")
+
+    def __init__(self, image_processor, queue_size=1):
+        self.image_processor = image_processor
+        self.capture_queue = LatestFrameQueue(queue_size, on_drop=self.recycle)
+        self.result_queue = LatestFrameQueue(queue_size, on_drop=self.recycle)
+        self.stats = {name: StageStats(name) for name in self.STAGES}
+        self.running = False
+        self._threads = []
+
+    def start(self):
+        """Start the capture and inference threads."""
+        self.running = True
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="capture", daemon=True),
+            threading.Thread(target=self._inference_loop, name="inference", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        """Stop all stages and wait for the worker threads to exit."""
+        self.running = False
+        self.capture_queue.close()
+        self.result_queue.close()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        self._threads = []
+
+    def _capture_loop(self):
+        while self.running:
+            start = time.perf_counter()
+            frame = self.image_processor.capture_frame()
+            now = time.perf_counter()
+            if frame is None:
+                logging.debug("Capture returned no frame, stopping pipeline")
+                self.running = False
+                break
+            self.stats["capture"].record(now - start)
+            self.capture_queue.put(FramePacket(frame, now))
+        self.capture_queue.close()
+
+    def _inference_loop(self):
+        while True:
+            packet = self.capture_queue.get(timeout=0.1)
+            if packet is None:
+                if self.capture_queue.closed:
+                    break
+                continue
+            start = time.perf_counter()
+            packet.results = self.image_processor.process_hands(packet.frame)
+            self.image_processor.draw_landmarks(packet.frame, packet.results)
+            packet.inferred_at = time.perf_counter()
+            self.stats["inference"].record(packet.inferred_at - start)
+            self.result_queue.put(packet)
+        self.result_queue.close()
+
+    def get(self, timeout=None):
+        """Return the newest inferred frame, or None if nothing is ready."""
+        return self.result_queue.get(timeout)
+
+    @property
+    def finished(self):
+        """True once the pipeline has stopped and every frame was consumed."""
+        return self.result_queue.closed and not len(self.result_queue)
+
+    def mark_rendered(self, seconds):
+        """Record the time the caller spent rendering a frame."""
+        self.stats["render"].record(seconds)
+
+    def mark_shown(self, packet):
+        """Record end-to-end latency for a frame that has just been displayed."""
+        self.stats["end_to_end"].record(time.perf_counter() - packet.captured_at)
+
+    def recycle(self, packet):
+        """Return a packet's frame buffer to the capture pool once it is no longer used."""
+        release = getattr(self.image_processor, "release_frame", None)
+        if release is not None:
+            release(packet.frame)
+        packet.frame = None
+
+    def summary(self):
+        """Return a human-readable summary of the stage counters."""
+        lines = [str(self.stats[name]) for name in self.STAGES]
+        lines.append(f"dropped: capture={self.capture_queue.dropped} inference={self.result_queue.dropped}")
+        return "\n".join(lines)
@@ -0,0 +1,259 @@
+"""Named timing spans with rolling percentiles, an on-screen HUD and metrics export.
+
+Code under measurement wraps each stage in ``with profiler.span("name"):``
+on the shared module-level ``profiler``. While it is disabled (the
+default) ``span`` hands back a do-nothing context manager, so the
+instrumentation costs a method call and nothing is recorded.
+
+Each span keeps its latest ``window`` durations in a fixed ring buffer for
+p50/p95/p99, plus lifetime count, sum and max. A span object is reused
+for every entry, so one name must not be timed from two threads at once.
+"""
+import contextlib
+import csv
+import json
+import logging
+import threading
+import time
+from array import array
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2 as cv
+import numpy as np
+
+QUANTILES = (50, 95, 99)
+
+
+class SpanStats:
+    """Lifetime totals and a rolling window of durations for one span."""
+
+    def __init__(self, name, window=512):
+        self.name = name
+        self.window = window
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        # Typed array for cheap appends, NumPy view for the percentiles
+        self._samples = array("d", [0.0]) * window
+        self._view = np.frombuffer(self._samples, dtype=np.float64)
+
+    def record(self, seconds):
+        self._samples[self.count % self.window] = seconds
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def summary(self):
+        """Return count, sum, mean, max and the QUANTILES over the window, in seconds."""
+        filled = self._view[:min(self.count, self.window)]
+        p50, p95, p99 = np.percentile(filled, QUANTILES) if filled.size else (0.0, 0.0, 0.0)
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+            "p50": float(p50),
+            "p95": float(p95),
+            "p99": float(p99),
+        }
+
+
+class _Span:
+    __slots__ = ("stats", "start")
+
+    def __init__(self, stats):
+        self.stats = stats
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.stats.record(time.perf_counter() - self.start)
+
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+class Profiler:
+    """Registry of named spans; see the module docstring."""
+
+    def __init__(self, enabled=False, window=512):
+        self.enabled = enabled
+        self.window = window
+        self._stats = {}
+        self._spans = {}
+
+    def span(self, name):
+        """Return a context manager timing the enclosed block under ``name``."""
+        if not self.enabled:
+            return _NULL_SPAN
+        span = self._spans.get(name)
+        if span is None:
+            span = self._spans.setdefault(name, _Span(self.stats(name)))
+        return span
+
+    def record(self, name, seconds):
+        """Record a duration measured elsewhere."""
+        if self.enabled:
+            self.stats(name).record(seconds)
+
+    def stats(self, name):
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats.setdefault(name, SpanStats(name, self.window))
+        return stats
+
+    def snapshot(self):
+        """Return {span name: summary} for every span recorded so far."""
+        return {name: stats.summary() for name, stats in list(self._stats.items())}
+
+    def reset(self):
+        self._stats.clear()
+        self._spans.clear()
+
+    def report(self):
+        """Return a human-readable table of the spans, in milliseconds."""
+        lines = [f"{'span':<20} {'n':>7} {'mean':>7} {'p50':>7} {'p95':>7} {'p99':>7} {'max':>7}"]
+        for name, s in sorted(self.snapshot().items()):
+            lines.append(f"{name:<20} {s['count']:>7} " + " ".join(
+                f"{s[key] * 1000:>7.2f}" for key in ("mean", "p50", "p95", "p99", "max")))
+        return "\n".join(lines)
+
+
+# Shared instance used by the instrumented modules
+profiler = Profiler()
+
+
+class Hud:
+    """Draw a small table of span timings in a corner of the screen.
+
+    The figures are refreshed every ``refresh`` seconds rather than every
+    frame, which keeps the percentile computation off the frame budget
+    and the numbers readable.
+    """
+
+    def __init__(self, source=None, refresh=0.5, origin=(10, 80)):
+        self.source = source or profiler
+        self.refresh = refresh
+        self.origin = origin
+        self._lines = []
+        self._updated = -refresh
+
+    def draw(self, img):
+        now = time.monotonic()
+        if now - self._updated >= self.refresh:
+            self._updated = now
+            self._lines = [f"{'span':<18}{'p50':>7}{'p95':>7}{'p99':>7}"] + [
+                f"{name:<18}{s['p50'] * 1000:>7.1f}{s['p95'] * 1000:>7.1f}{s['p99'] * 1000:>7.1f}"
+                for name, s in sorted(self.source.snapshot().items())]
+        x, y = self.origin
+        height = 16 * len(self._lines) + 8
+        roi = img[y:y + height, x:x + 400]
+        # Darken the backdrop in place so the text stays readable over video
+        roi >>= 1
+        for i, line in enumerate(self._lines):
+            cv.putText(img, line, (x + 6, y + 16 * (i + 1)), cv.FONT_HERSHEY_PLAIN, 1.0, (255, 255, 255), 1)
+        return img
+
+
+class MetricsWriter:
+    """Append span summaries to a CSV or JSON-lines file at a fixed interval.
+
+    The format follows the file extension: ``.csv`` for CSV, anything else
+    for one JSON object per span per write. Durations are in milliseconds.
+    """
+
+    FIELDS = ("time", "span", "count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms")
+
+    def __init__(self, path, interval=1.0, source=None):
+        self.path = path
+        self.interval = interval
+        self.source = source or profiler
+        self._file = open(path, "a", newline="")
+        self._csv = None
+        if path.lower().endswith(".csv"):
+            self._csv = csv.writer(self._file)
+            # Later runs add rows under the header the first one wrote
+            if self._file.tell() == 0:
+                self._csv.writerow(self.FIELDS)
+        self._last = time.monotonic()
+
+    def poll(self):
+        """Write a sample if the interval has passed since the last one."""
+        now = time.monotonic()
+        if now - self._last >= self.interval:
+            self._last = now
+            self.write()
+
+    def write(self):
+        now = round(time.time(), 3)
+        for name, s in sorted(self.source.snapshot().items()):
+            row = (now, name, s["count"]) + tuple(
+                round(s[key] * 1000, 3) for key in ("mean", "p50", "p95", "p99", "max"))
+            if self._csv:
+                self._csv.writerow(row)
+            else:
+                self._file.write(json.dumps(dict(zip(self.FIELDS, row))) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self.write()
+        self._file.close()
+
+
+def prometheus_text(snapshot, prefix="rps"):
+    """Format a snapshot in the Prometheus text exposition format, as a summary."""
+    metric = f"{prefix}_span_seconds"
+    lines = [f"# HELP {metric} Time spent in each instrumented stage.", f"# TYPE {metric} summary"]
+    for name, s in sorted(snapshot.items()):
+        for q in QUANTILES:
+            lines.append(f'{metric}{{span="{name}",quantile="{q / 100:g}"}} {s[f"p{q}"]:.6f}')
+        lines.append(f'{metric}_sum{{span="{name}"}} {s["sum"]:.6f}')
+        lines.append(f'{metric}_count{{span="{name}"}} {s["count"]}')
+    return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Serve ``/metrics`` in Prometheus text format from a background thread.
+
+    Binds to localhost by default; the timings are for local dashboards,
+    not something to expose on the network.
+    """
+
+    def __init__(self, port=9100, host="127.0.0.1", source=None):
+        source = source or profiler
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = prometheus_text(source.snapshot()).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logging.debug("metrics: " + format, *args)
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="metrics", daemon=True)
+
+    @property
+    def address(self):
+        return self.httpd.server_address
+
+    def start(self):
+        self._thread.start()
+        logging.info("Serving metrics on http://%s:%d/metrics", *self.address[:2])
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
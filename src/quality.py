@@ -0,0 +1,112 @@
+"""Adaptive quality: trade visual effects and inference cost for frame rate.
+
+QUALITY_LEVELS runs from full quality (0) to the cheapest settings. The
+QualityController is fed the time each frame cost and steps one level
+down when frames overrun the target budget, or one level up when there is
+clear headroom. Changes are separated by a cooldown, and a level that an
+upgrade had to be undone from right away is not tried again, so the level
+settles instead of flapping between two neighbours.
+"""
+import logging
+
+# Each level lists every knob so applying one never depends on the last
+QUALITY_LEVELS = (
+    {"glass": "high", "blur_kernel": (21, 21), "inference_scale": 1.0, "idle_stride": 3, "landmarks": True},
+    {"glass": "high", "blur_kernel": (11, 11), "inference_scale": 1.0, "idle_stride": 3, "landmarks": True},
+    {"glass": "fast", "blur_kernel": (21, 21), "inference_scale": 1.0, "idle_stride": 3, "landmarks": True},
+    {"glass": "fast", "blur_kernel": (21, 21), "inference_scale": 0.75, "idle_stride": 4, "landmarks": True},
+    {"glass": "off", "blur_kernel": (21, 21), "inference_scale": 0.5, "idle_stride": 4, "landmarks": True},
+    {"glass": "off", "blur_kernel": (21, 21), "inference_scale": 0.5, "idle_stride": 6, "landmarks": False},
+)
+
+
+def apply_quality(settings, image_processor=None, ui=None):
+    """Push one QUALITY_LEVELS entry onto an ImageProcessor and/or UserInterface."""
+    if image_processor is not None:
+        image_processor.inference_scale = settings["inference_scale"]
+        image_processor.idle_stride = settings["idle_stride"]
+        image_processor.show_landmarks = settings["landmarks"]
+    if ui is not None:
+        ui.glass_quality = settings["glass"]
+        ui.glass_kernel = settings["blur_kernel"]
+
+
+class QualityController:
+    """Pick a quality level from measured frame times; see the module docstring.
+
+    Frame costs are averaged over ``window`` frames and compared with the
+    target frame budget: above ``degrade_load`` of the budget steps down,
+    below ``upgrade_load`` for ``upgrade_windows`` windows in a row steps up.
+    Overrunning within ``4 * cooldown`` windows of an upgrade marks that
+    level as too expensive: ``best_level`` rises past it and it is not
+    probed again. ``on_change`` is called with (level, settings) whenever
+    the level moves.
+    """
+
+    def __init__(self, target_fps=30, levels=QUALITY_LEVELS, on_change=None, level=0, window=30,
+                 degrade_load=0.95, upgrade_load=0.6, upgrade_windows=3, cooldown=2):
+        self.budget = 1.0 / target_fps
+        self.levels = levels
+        self.on_change = on_change
+        self.level = level
+        self.window = window
+        self.degrade_load = degrade_load
+        self.upgrade_load = upgrade_load
+        self.upgrade_windows = upgrade_windows
+        self.cooldown = cooldown
+        self.load = 0.0
+        # Best (lowest) level still worth trying
+        self.best_level = 0
+        self._sum = 0.0
+        self._count = 0
+        self._wait = cooldown
+        self._good = 0
+        self._windows_since_upgrade = None
+
+    @property
+    def settings(self):
+        return self.levels[self.level]
+
+    def update(self, frame_seconds):
+        """Record the cost of one frame and return the current level."""
+        self._sum += frame_seconds
+        self._count += 1
+        if self._count >= self.window:
+            self.load = self._sum / self._count / self.budget
+            self._sum = 0.0
+            self._count = 0
+            self._evaluate()
+        return self.level
+
+    def _evaluate(self):
+        if self._windows_since_upgrade is not None:
+            self._windows_since_upgrade += 1
+            if self._windows_since_upgrade > 4 * self.cooldown:
+                # The last upgrade held up
+                self._windows_since_upgrade = None
+        if self._wait:
+            self._wait -= 1
+            return
+        if self.load > self.degrade_load and self.level < len(self.levels) - 1:
+            if self._windows_since_upgrade is not None:
+                # This level was only just upgraded to and cannot hold the budget
+                self._windows_since_upgrade = None
+                self.best_level = self.level + 1
+                logging.info("Quality level %d overran right after an upgrade; not trying it again", self.level)
+            self._set_level(self.level + 1)
+        elif self.load < self.upgrade_load and self.level > self.best_level:
+            self._good += 1
+            if self._good >= self.upgrade_windows:
+                self._windows_since_upgrade = 0
+                self._set_level(self.level - 1)
+        else:
+            self._good = 0
+
+    def _set_level(self, level):
+        logging.info("Quality level %d -> %d (load %.0f%% of the %.1fms budget)",
+                     self.level, level, self.load * 100, self.budget * 1000)
+        self.level = level
+        self._good = 0
+        self._wait = self.cooldown
+        if self.on_change:
+            self.on_change(level, self.levels[level])
@@ -1,15 +1,49 @@
-import cv2 as cv
+import argparse
+import logging
 import time
 from image_processing import ImageProcessor
 from game_logic import GameLogic
 from user_interaction import UserInteraction
 from user_interface import UserInterface
+from pipeline import Pipeline
+from game_clock import GameClock
+from profiler import Hud, MetricsServer, MetricsWriter, profiler
+from quality import QUALITY_LEVELS, QualityController, apply_quality
+from sinks import WindowSink, open_sinks
 
-def main():
-    # Initialize components
-    image_processor = ImageProcessor()
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Play Rock Paper Scissors against the computer with your webcam.")
+    parser.add_argument("--source", default="0", help="camera index, video file, image directory or \"synthetic\"")
+    parser.add_argument("--output", action="append",
+                        help="window, null, video:PATH or mjpeg:PORT; repeat for several (default: window)")
+    parser.add_argument("--target-fps", type=float, default=30,
+                        help="frame rate the adaptive quality controller aims for")
+    parser.add_argument("--quality", type=int, choices=range(len(QUALITY_LEVELS)),
+                        help="pin a quality level (0 = best) instead of adapting it")
+    parser.add_argument("--profile", action="store_true", help="time each frame stage and log a report on exit")
+    parser.add_argument("--hud", action="store_true", help="overlay live stage timings (implies --profile)")
+    parser.add_argument("--metrics-file", help="append stage timings to a .csv or .jsonl file (implies --profile)")
+    parser.add_argument("--metrics-port", type=int, help="serve Prometheus metrics on localhost (implies --profile)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # Profiling; every span is a no-op unless enabled here
+    profiler.enabled = bool(args.profile or args.hud or args.metrics_file or args.metrics_port)
+    hud = Hud() if args.hud else None
+    metrics_writer = MetricsWriter(args.metrics_file) if args.metrics_file else None
+    metrics_server = MetricsServer(args.metrics_port).start() if args.metrics_port else None
+
+    # Initialize components. The camera opens and the model loads in the
+    # background; the UI is shown with a placeholder until both are ready
+    start_time = time.perf_counter()
+    image_processor = ImageProcessor(source=args.source, background=True)
     game_logic = GameLogic()
     ui = UserInterface()
+    sink = open_sinks(args.output or ["window"], window_name="Rock Paper Scissors Game",
+                      width=ui.screen_width, height=ui.screen_height)
+    sinks = getattr(sink, "sinks", [sink])
     interaction = UserInteraction(
         window_name="Rock Paper Scissors Game",
         buttons=[],
@@ -19,57 +53,126 @@ def main():
         on_close=lambda: setattr(main, "running", False)
     )
 
-    # Setup window
-    cv.namedWindow("Rock Paper Scissors Game", cv.WINDOW_NORMAL)
-    cv.resizeWindow("Rock Paper Scissors Game", ui.screen_width, ui.screen_height)
-
-    # Set mouse callback after window creation
-    interaction.set_mouse_callback()
+    # Set mouse callback after window creation; without a window there are
+    # no buttons to press, so start playing straight away
+    if any(isinstance(s, WindowSink) for s in sinks):
+        interaction.set_mouse_callback()
+    else:
+        game_logic.start_game()
 
-    # Setup buttons
+    # Setup buttons; clicks are hit-tested against the layout the UI assigns
     buttons = interaction.setup_buttons()
+    ui.on_layout = interaction.set_layout
+    ui.layout_buttons(buttons)
 
-    # FPS control
+    # Frame pacing; game time comes from a monotonic clock, not the frame count
     FPS = 30
-    last_time = time.time()
+    game_clock = GameClock()
+
+    # Quality settings follow the measured frame cost unless pinned
+    quality = None
+    if args.quality is not None:
+        apply_quality(QUALITY_LEVELS[args.quality], image_processor, ui)
+    else:
+        quality = QualityController(args.target_fps,
+                                    on_change=lambda level, settings: apply_quality(settings, image_processor, ui))
     main.running = True
 
-    while main.running:
-        # Capture and process frame
-        frame = image_processor.capture_frame()
-        if frame is None:
-            break
-
-        results = image_processor.process_hands(frame)
-        frame = image_processor.draw_landmarks(frame, results)
-
-        # Update game state
-        now = time.time()
-        if now - last_time >= 1 / FPS:
-            if game_logic.game_state == game_logic.GAME_STATES["RUNNING"] and not game_logic.match_ended:
-                game_logic.clock = (game_logic.clock + 1) % 100
-            last_time = now
-
-        # Process player move
-        success = False
-        player_move = None
-        if results.multi_hand_landmarks and len(results.multi_hand_landmarks) == 1:
-            player_move = image_processor.get_hand_move(results.multi_hand_landmarks[0])
-            success = True
-
-        game_logic.update_game_state(game_logic.clock, player_move, success)
-
-        # Render UI
-        full_screen = ui.render(frame, game_logic.get_state(), buttons)
-        cv.imshow("Rock Paper Scissors Game", full_screen)
-
-        # Handle exit
-        if cv.waitKey(1) & 0xFF == ord('q'):
-            break
-
-    # Cleanup
-    image_processor.release()
-    cv.destroyAllWindows()
+    # Latest player read, reused while inference has nothing new
+    player_move = None
+    success = False
+    confidence = 0.0
+    pipeline = None
+
+    # Headless runs have no 'q' key; Ctrl+C stops them cleanly. Startup is
+    # inside the try so a failed camera or model load still cleans up
+    try:
+        # Keep the window responsive while waiting for the camera and model
+        placeholder = ui.message_frame("Starting camera...")
+        while main.running:
+            sink.write(ui.render(placeholder, game_logic.get_state(), buttons))
+            interaction.handle_key(sink.poll_key())
+            interaction.process_events()
+            if image_processor.wait_ready(1 / FPS):
+                break
+
+        # Closed before the camera and model were ready: nothing to run
+        if image_processor.ready:
+            logging.info("Camera and hand tracking ready after %.2fs", time.perf_counter() - start_time)
+
+            # Capture and hand inference run on their own threads
+            pipeline = Pipeline(image_processor)
+            pipeline.start()
+            game_clock.reset()
+
+        while pipeline is not None and main.running:
+            # Wait for the newest processed frame
+            packet = pipeline.get(timeout=1 / FPS)
+            if packet is None:
+                if pipeline.finished:
+                    break
+                game_logic.advance(game_clock.poll(), player_move, success, confidence, fresh=False)
+                interaction.handle_key(sink.poll_key())
+                interaction.process_events()
+                continue
+            frame, results = packet.frame, packet.results
+            frame_start = time.perf_counter()
+
+            # Process player move
+            success = False
+            player_move = None
+            confidence = 0.0
+            if results.multi_hand_landmarks and len(results.multi_hand_landmarks) == 1:
+                player_move = image_processor.get_hand_move(results.multi_hand_landmarks[0])
+                confidence = results.multi_handedness[0].classification[0].score
+                success = True
+
+            # Update game state
+            with profiler.span("game.advance"):
+                game_logic.advance(game_clock.poll(), player_move, success, confidence)
+
+            # Only track hands at full rate around the shoot moment
+            image_processor.full_rate = game_logic.is_sampling_move()
+
+            # Render UI
+            render_start = time.perf_counter()
+            full_screen = ui.render(frame, game_logic.get_state(), buttons)
+            render_time = time.perf_counter() - render_start
+            pipeline.mark_rendered(render_time)
+            profiler.record("render", render_time)
+            if hud:
+                hud.draw(full_screen)
+            with profiler.span("output"):
+                sink.write(full_screen)
+            pipeline.mark_shown(packet)
+            profiler.record("end_to_end", pipeline.stats["end_to_end"].last)
+            pipeline.recycle(packet)
+            if quality:
+                # The frame rate is set by the slower of the inference thread
+                # and this thread's own work
+                quality.update(max(pipeline.stats["inference"].last, time.perf_counter() - frame_start))
+            if metrics_writer:
+                metrics_writer.poll()
+
+            # Handle input queued since the last frame ('q' or Esc closes)
+            with profiler.span("input"):
+                interaction.handle_key(sink.poll_key())
+                interaction.process_events()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # Cleanup
+        if pipeline is not None:
+            pipeline.stop()
+            logging.info("Pipeline stats:\n%s", pipeline.summary())
+        if profiler.enabled:
+            logging.info("Stage timings (ms):\n%s", profiler.report())
+        if metrics_writer:
+            metrics_writer.close()
+        if metrics_server:
+            metrics_server.stop()
+        image_processor.release()
+        sink.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,183 @@
+"""Host several independent game tables in one process.
+
+Each session owns a capture source (device index, video file, stream URL,
+image directory or "synthetic"),
+its own GameLogic and an optional output sink. Hand detection for all
+sessions runs on one shared InferenceService, so the model is loaded once
+per worker process rather than once per camera.
+
+Usage: python server.py SOURCE [SOURCE ...] [--workers N]
+"""
+import argparse
+import logging
+import threading
+import time
+from concurrent import futures
+
+import cv2 as cv
+
+from capture import open_source
+from game_clock import GameClock
+from game_logic import GameLogic
+from gestures import MOVES, classify_landmarks
+from image_processing import draw_landmark_array
+from inference_service import InferenceService
+from sinks import open_sink
+from user_interface import UserInterface
+
+
+def parse_source(source):
+    """Turn a command-line source into a capture.open_source spec."""
+    return int(source) if source.isdigit() else source
+
+
+class GameSession(threading.Thread):
+    """One game table: camera, game state, rendering and output."""
+
+    def __init__(self, session_id, source, inference, sink=None, video_width=640, video_height=480,
+                 restart_delay=3.0, frame_budget=0.1, result_timeout=1.0):
+        super().__init__(name=f"session-{session_id}", daemon=True)
+        self.session_id = session_id
+        self.source = source
+        self.inference = inference
+        # Any sinks.OutputSink except a window, which needs the main thread
+        self.sink = sink
+        self.video_width = video_width
+        self.video_height = video_height
+        self.restart_delay = restart_delay
+        # Detections that cannot start within this many seconds are dropped
+        self.frame_budget = frame_budget
+        # ...and a started detection is given up on after this many more
+        self.result_timeout = result_timeout
+        self.game_logic = GameLogic()
+        self.ui = UserInterface(video_width=video_width, video_height=video_height) if sink else None
+        self.frames = 0
+        # Set before start() so a stop() that lands first is not overwritten
+        self.running = True
+
+    def run(self):
+        # Every exit goes through the finally, so the sink is always closed
+        vid = None
+        try:
+            if not self.running:
+                return
+            vid = open_source(self.source, self.video_width, self.video_height)
+            if not vid.opened:
+                logging.error("Session %s: cannot open source %r", self.session_id, self.source)
+                return
+            game_clock = GameClock()
+            game_clock.reset()
+            self.game_logic.start_game()
+            match_ended_at = None
+            landmarks = None
+            move, success, confidence = None, False, 0.0
+            while self.running:
+                ret, frame = vid.read()
+                if not ret:
+                    break
+                frame = cv.flip(frame, 1)
+                if frame.shape[1] != self.video_width or frame.shape[0] != self.video_height:
+                    frame = cv.resize(frame, (self.video_width, self.video_height))
+
+                # Keep the previous read if the frame missed its deadline, its
+                # worker died or the wait timed out
+                fresh = True
+                try:
+                    landmarks, scores = self.inference.detect(
+                        frame, deadline=time.monotonic() + self.frame_budget).result(
+                        timeout=self.frame_budget + self.result_timeout)
+                    if len(landmarks) == 1:
+                        move, success, confidence = MOVES[classify_landmarks(landmarks[0])], True, float(scores[0])
+                    else:
+                        move, success, confidence = None, False, 0.0
+                except (TimeoutError, futures.TimeoutError, futures.CancelledError, RuntimeError):
+                    if self.inference.closed:
+                        break
+                    fresh = False
+                self.game_logic.advance(game_clock.poll(), move, success, confidence, fresh=fresh)
+
+                # Start the next match a little while after one ends
+                if self.game_logic.match_ended:
+                    now = time.monotonic()
+                    if match_ended_at is None:
+                        match_ended_at = now
+                    elif now - match_ended_at >= self.restart_delay:
+                        self.game_logic.restart_game()
+                        self.game_logic.start_game()
+                        match_ended_at = None
+
+                if self.sink:
+                    if landmarks is not None:
+                        draw_landmark_array(frame, landmarks)
+                    self.sink.write(self.ui.render(frame, self.game_logic.get_state(), []))
+                self.frames += 1
+        finally:
+            self.running = False
+            if vid is not None:
+                vid.release()
+            if self.sink:
+                self.sink.close()
+
+    def stop(self):
+        self.running = False
+
+
+class GameServer:
+    """Run N game sessions over a shared inference service and report their FPS."""
+
+    def __init__(self, sources, workers=2, output=None, video_width=640, video_height=480):
+        self.inference = InferenceService(workers, (video_height, video_width, 3))
+        self.sessions = [GameSession(i, source, self.inference, open_sink(output, index=i) if output else None,
+                                     video_width, video_height)
+                         for i, source in enumerate(sources)]
+
+    def fps_report(self, counts, elapsed):
+        """Return per-session FPS since the previous report."""
+        return {s.session_id: (s.frames - counts[s.session_id]) / elapsed for s in self.sessions}
+
+    def run(self, report_interval=5.0):
+        """Run until every session has finished or the server is interrupted."""
+        self.inference.wait_ready()
+        for session in self.sessions:
+            session.start()
+        counts = {s.session_id: 0 for s in self.sessions}
+        last = time.monotonic()
+        try:
+            while any(s.is_alive() for s in self.sessions):
+                time.sleep(report_interval)
+                now = time.monotonic()
+                fps = self.fps_report(counts, now - last)
+                counts = {s.session_id: s.frames for s in self.sessions}
+                last = now
+                logging.info("FPS per session: %s", ", ".join(f"{sid}={v:.1f}" for sid, v in fps.items()))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self):
+        for session in self.sessions:
+            session.stop()
+        for session in self.sessions:
+            session.join(timeout=2.0)
+        self.inference.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run several game tables over a shared hand detection pool.")
+    parser.add_argument("sources", nargs="+", help="camera indices, video files, stream URLs, image directories or \"synthetic\"")
+    parser.add_argument("--workers", type=int, default=2, help="hand detection processes")
+    parser.add_argument("--output", help="per-table output: null, video:PATH or mjpeg:PORT "
+                                         "(the table index is appended to the path / added to the port)")
+    parser.add_argument("--report-interval", type=float, default=5.0, help="seconds between FPS reports")
+    args = parser.parse_args()
+
+    if args.output and args.output.startswith("window"):
+        parser.error("--output window is not supported here; windows must be driven from the main thread")
+    server = GameServer([parse_source(s) for s in args.sources], args.workers, args.output)
+    server.run(args.report_interval)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
@@ -0,0 +1,129 @@
+"""Headless best-of-3 match simulation for GameLogic.
+
+``simulate_matches`` drives real GameLogic instances one tick's worth of
+time at a time, exactly as the game loop does but without a camera, window
+or frame pacing.
+``simulate_matches_vectorized`` resolves whole batches of matches with
+NumPy for strategy statistics.
+
+Usage: python simulator.py [--matches N] [--seed S] [--vectorized]
+"""
+import argparse
+import collections
+import itertools
+import logging
+import random
+import time
+
+import numpy as np
+
+from game_logic import GameLogic
+from gestures import MOVES, OUTCOMES
+
+
+def random_player(rng, weights=None):
+    """Return a player that picks moves at random, optionally weighted."""
+    return lambda game_logic: rng.choices(MOVES, weights)[0]
+
+
+def scripted_player(moves):
+    """Return a player that plays the given moves in order, cycling."""
+    script = itertools.cycle(moves)
+    return lambda game_logic: next(script)
+
+
+def play_match(game_logic, player, max_ticks=1_000_000):
+    """Play one match to completion and return the number of ticks it took.
+
+    ``player`` is called with the GameLogic once per round, just before the
+    move is read, and returns "rock", "paper", "scissors" or None (no hand).
+    """
+    game_logic.restart_game()
+    game_logic.start_game()
+    read_from = game_logic.SHOOT_CLOCK - game_logic.VOTE_LEAD
+    move = None
+    ticks = 0
+    tick = 1 / game_logic.TICK_RATE
+    while not game_logic.match_ended and ticks < max_ticks:
+        if (game_logic.clock + 1) % 100 == read_from:
+            move = player(game_logic)
+        ticks += game_logic.advance(tick, move, move is not None)
+    return ticks
+
+
+def simulate_matches(n, player=None, seed=None):
+    """Play n matches through GameLogic and return outcome statistics."""
+    rng = random.Random(seed)
+    player = player or random_player(random.Random(rng.random()))
+    game_logic = GameLogic(rng=rng)
+    winners = collections.Counter()
+    rounds = collections.Counter()
+    total_ticks = 0
+
+    # Per-tick debug logging would dominate the run time
+    previous_disable = logging.root.manager.disable
+    logging.disable(logging.DEBUG)
+    try:
+        for _ in range(n):
+            total_ticks += play_match(game_logic, player)
+            winners["player" if game_logic.player_score > game_logic.computer_score else "computer"] += 1
+            rounds[game_logic.player_score + game_logic.computer_score] += 1
+    finally:
+        logging.disable(previous_disable)
+
+    return {"matches": n, "winners": dict(winners), "decisive_rounds": dict(rounds), "ticks": total_ticks}
+
+
+def simulate_matches_vectorized(n, player_weights=None, computer_weights=None, seed=None):
+    """Resolve n matches at once with NumPy and return outcome statistics.
+
+    Each loop iteration plays one round of every unfinished match; draws
+    are replayed, and a match ends when either side reaches two wins.
+    """
+    rng = np.random.default_rng(seed)
+    player_p = None if player_weights is None else np.asarray(player_weights) / np.sum(player_weights)
+    computer_p = None if computer_weights is None else np.asarray(computer_weights) / np.sum(computer_weights)
+    player_score = np.zeros(n, dtype=np.int8)
+    computer_score = np.zeros(n, dtype=np.int8)
+    rounds_played = np.zeros(n, dtype=np.int32)
+    active = np.arange(n)
+
+    while active.size:
+        outcome = OUTCOMES[rng.choice(len(MOVES), active.size, p=player_p),
+                           rng.choice(len(MOVES), active.size, p=computer_p)]
+        player_score[active] += outcome == 1
+        computer_score[active] += outcome == -1
+        rounds_played[active] += 1
+        active = active[(player_score[active] < 2) & (computer_score[active] < 2)]
+
+    player_wins = int(np.count_nonzero(player_score == 2))
+    return {
+        "matches": n,
+        "winners": {"player": player_wins, "computer": n - player_wins},
+        "rounds_played": np.bincount(rounds_played).tolist(),
+        "draws": int(rounds_played.sum() - player_score.sum() - computer_score.sum()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate best-of-3 matches without a camera or window.")
+    parser.add_argument("--matches", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--vectorized", action="store_true", help="resolve matches with NumPy instead of GameLogic")
+    parser.add_argument("--script", nargs="+", choices=MOVES, help="fixed player move sequence")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.vectorized:
+        stats = simulate_matches_vectorized(args.matches, seed=args.seed)
+    else:
+        player = scripted_player(args.script) if args.script else None
+        stats = simulate_matches(args.matches, player, seed=args.seed)
+    elapsed = time.perf_counter() - start
+    print(f"{args.matches} matches in {elapsed:.2f}s ({args.matches / elapsed:,.0f} matches/s)")
+    for key, value in stats.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""Output sinks for rendered game screens.
+
+A sink takes the images returned by ``UserInterface.render``:
+``write(image)`` for every frame, ``poll_key()`` once per loop for keyboard
+input (-1 when there is none) and ``close()`` at the end. ``write`` must
+not keep a reference to the image, since render reuses its buffer.
+
+The video file and MJPEG sinks copy each frame into a pooled buffer and
+encode on a background thread behind a small latest-frame queue, so a
+slow encoder drops frames instead of stalling the game loop.
+
+Specs for ``open_sink``: "window", "null", "video:PATH" or "mjpeg:PORT".
+"""
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2 as cv
+
+from frame_pool import FramePool
+from pipeline import LatestFrameQueue
+
+
+class OutputSink:
+    """Base sink that discards everything."""
+
+    def write(self, image):
+        pass
+
+    def poll_key(self):
+        return -1
+
+    def close(self):
+        pass
+
+
+class NullSink(OutputSink):
+    """Count frames and drop them, for benchmarks and headless runs."""
+
+    def __init__(self):
+        self.frames = 0
+
+    def write(self, image):
+        self.frames += 1
+
+
+class WindowSink(OutputSink):
+    """Show frames in a HighGUI window; must be used from the main thread."""
+
+    def __init__(self, window_name, width, height):
+        self.window_name = window_name
+        cv.namedWindow(window_name, cv.WINDOW_NORMAL)
+        cv.resizeWindow(window_name, width, height)
+
+    def write(self, image):
+        cv.imshow(self.window_name, image)
+
+    def poll_key(self):
+        return cv.waitKey(1) & 0xFF
+
+    def close(self):
+        cv.destroyWindow(self.window_name)
+
+
+class BackgroundSink(OutputSink):
+    """Hand frames to ``consume`` on a worker thread through a bounded queue."""
+
+    def __init__(self, queue_size=2, name="sink"):
+        self.queue_size = queue_size
+        self.pool = None
+        self.queue = LatestFrameQueue(queue_size, on_drop=self._release)
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    @property
+    def dropped(self):
+        return self.queue.dropped
+
+    def _release(self, frame):
+        self.pool.release(frame)
+
+    def write(self, image):
+        if self.pool is None:
+            self.pool = FramePool(image.shape, image.dtype, self.queue_size + 2)
+        frame = self.pool.acquire()
+        frame[...] = image
+        self.queue.put(frame)
+
+    def _run(self):
+        while True:
+            frame = self.queue.get(timeout=0.1)
+            if frame is None:
+                if self.queue.closed:
+                    break
+                continue
+            try:
+                self.consume(frame)
+            except Exception:
+                logging.exception("%s failed to handle a frame", type(self).__name__)
+            finally:
+                self.pool.release(frame)
+        self.finish()
+
+    def consume(self, frame):
+        raise NotImplementedError
+
+    def finish(self):
+        pass
+
+    def close(self):
+        self.queue.close()
+        self._thread.join(timeout=5.0)
+        if self.dropped:
+            logging.info("%s dropped %d frames", type(self).__name__, self.dropped)
+
+
+class VideoFileSink(BackgroundSink):
+    """Encode frames to a video file with cv.VideoWriter.
+
+    Frames are written at a nominal ``fps``; frames dropped under load are
+    simply missing, so playback runs slightly fast rather than stuttering.
+    """
+
+    def __init__(self, path, fps=30, fourcc="mp4v", queue_size=8):
+        self.path = path
+        self.fps = fps
+        self.fourcc = fourcc
+        self.writer = None
+        super().__init__(queue_size, name="video-writer")
+
+    def consume(self, frame):
+        if self.writer is None:
+            height, width = frame.shape[:2]
+            self.writer = cv.VideoWriter(self.path, cv.VideoWriter_fourcc(*self.fourcc), self.fps, (width, height))
+            if not self.writer.isOpened():
+                raise IOError(f"Cannot open video writer for {self.path}")
+            logging.info("Recording to %s", self.path)
+        self.writer.write(frame)
+
+    def finish(self):
+        if self.writer is not None:
+            self.writer.release()
+
+
+class MjpegStreamSink(BackgroundSink):
+    """Serve frames as an MJPEG stream (multipart/x-mixed-replace) over HTTP.
+
+    Binds to localhost by default. Frames are only JPEG-encoded while at
+    least one client is connected; ``max_fps`` caps the encode rate.
+    """
+
+    BOUNDARY = "frame"
+
+    def __init__(self, port=8080, host="127.0.0.1", quality=80, max_fps=None):
+        self.quality = quality
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self.clients = 0
+        self._jpeg = None
+        self._seq = 0
+        self._last_encode = 0.0
+        self._cond = threading.Condition()
+        self._running = True
+        super().__init__(queue_size=1, name="mjpeg-encoder")
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        threading.Thread(target=self.httpd.serve_forever, name="mjpeg-http", daemon=True).start()
+        logging.info("Streaming MJPEG on http://%s:%d/", *self.httpd.server_address[:2])
+
+    @property
+    def address(self):
+        return self.httpd.server_address
+
+    def write(self, image):
+        if self.clients:
+            super().write(image)
+
+    def consume(self, frame):
+        now = time.monotonic()
+        if now - self._last_encode < self.min_interval:
+            return
+        self._last_encode = now
+        ok, jpeg = cv.imencode(".jpg", frame, (cv.IMWRITE_JPEG_QUALITY, self.quality))
+        if ok:
+            with self._cond:
+                self._jpeg = jpeg.tobytes()
+                self._seq += 1
+                self._cond.notify_all()
+
+    def next_jpeg(self, seq, timeout=1.0):
+        """Wait for a JPEG newer than ``seq``; return (seq, bytes) or None when closing."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq > seq or not self._running, timeout)
+            if not self._running:
+                return None
+            return self._seq, self._jpeg
+
+    def _handler(self):
+        sink = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/":
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={sink.BOUNDARY}")
+                self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+                with sink._cond:
+                    sink.clients += 1
+                seq = 0
+                try:
+                    while True:
+                        latest = sink.next_jpeg(seq)
+                        if latest is None:
+                            break
+                        if latest[0] == seq:
+                            continue
+                        seq, jpeg = latest
+                        self.wfile.write(f"--{sink.BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                                         f"Content-Length: {len(jpeg)}\r\n\r\n".encode())
+                        self.wfile.write(jpeg)
+                        self.wfile.write(b"\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    with sink._cond:
+                        sink.clients -= 1
+
+            def log_message(self, format, *args):
+                logging.debug("mjpeg: " + format, *args)
+
+        return Handler
+
+    def close(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        super().close()
+
+
+class MultiSink(OutputSink):
+    """Fan frames out to several sinks; keys come from the first sink that has any."""
+
+    def __init__(self, sinks):
+        self.sinks = list(sinks)
+
+    def write(self, image):
+        for sink in self.sinks:
+            sink.write(image)
+
+    def poll_key(self):
+        key = -1
+        for sink in self.sinks:
+            polled = sink.poll_key()
+            if key == -1:
+                key = polled
+        return key
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+def open_sink(spec, window_name="Rock Paper Scissors Game", width=1280, height=720, index=None):
+    """Create a sink from a spec string.
+
+    With ``index`` set (one sink per table), video paths get "-<index>"
+    before the extension and MJPEG ports are offset by the index.
+    """
+    kind, _, arg = spec.partition(":")
+    if kind == "window":
+        return WindowSink(window_name, width, height)
+    if kind == "null":
+        return NullSink()
+    if kind == "video" and arg:
+        if index is not None:
+            root, ext = os.path.splitext(arg)
+            arg = f"{root}-{index}{ext}"
+        return VideoFileSink(arg)
+    if kind == "mjpeg":
+        port = int(arg or 8080)
+        return MjpegStreamSink(port + (index or 0))
+    raise ValueError(f"Unknown output sink {spec!r}; expected window, null, video:PATH or mjpeg:PORT")
+
+
+def open_sinks(specs, **kwargs):
+    """Create one sink per spec, combined into a MultiSink when there are several."""
+    sinks = [open_sink(spec, **kwargs) for spec in specs]
+    return sinks[0] if len(sinks) == 1 else MultiSink(sinks)
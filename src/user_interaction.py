@@ -1,25 +1,88 @@
+import collections
+
 import cv2 as cv
+import numpy as np
+
+# Keyboard shortcuts: key code -> action name
+DEFAULT_SHORTCUTS = {
+    ord("s"): "start",
+    ord("p"): "stop",
+    ord("r"): "reset",
+    ord("q"): "close",
+    27: "close",  # Esc
+}
 
 class UserInteraction:
-    def __init__(self, window_name, buttons, on_start, on_stop, on_restart, on_close):
+    """Turn mouse clicks and key presses into game actions.
+
+    HighGUI callbacks only queue raw events; the game loop calls
+    ``process_events`` once per tick to hit-test and run the actions on its
+    own thread. Clicks are resolved through a per-pixel button index that is
+    rebuilt only when the button layout changes.
+    """
+
+    def __init__(self, window_name, buttons, on_start, on_stop, on_restart, on_close, shortcuts=None):
         self.window_name = window_name
         self.buttons = buttons
         self.on_start = on_start
         self.on_stop = on_stop
         self.on_restart = on_restart
         self.on_close = on_close
+        self.actions = {"start": on_start, "stop": on_stop, "reset": on_restart, "close": on_close}
+        self.shortcuts = DEFAULT_SHORTCUTS if shortcuts is None else shortcuts
+        # deque appends and pops are atomic, so the callback needs no lock
+        self.events = collections.deque(maxlen=64)
+        self._hit_grid = np.full((0, 0), -1, dtype=np.int8)
+        self._hit_buttons = []
 
     def set_mouse_callback(self):
         """Set the mouse callback for the window."""
         cv.setMouseCallback(self.window_name, self.mouse_callback)
 
     def mouse_callback(self, event, x, y, flags, param):
-        """Handle mouse click events."""
+        """Queue mouse clicks for the next process_events."""
         if event == cv.EVENT_LBUTTONDOWN:
-            for btn in self.buttons:
-                bx, by, bw, bh = btn["rect"]
-                if bx < x < bx + bw and by < y < by + bh:
+            self.events.append(("click", x, y))
+
+    def handle_key(self, key):
+        """Queue a key code from waitKey; -1 and 255 (no key) are ignored."""
+        if key not in (-1, 255):
+            self.events.append(("key", key, None))
+
+    def set_layout(self, buttons):
+        """Rebuild the hit-test grid from the buttons' current rects."""
+        buttons = list(buttons)
+        width = max((bx + bw for bx, by, bw, bh in (btn["rect"] for btn in buttons)), default=0)
+        height = max((by + bh for bx, by, bw, bh in (btn["rect"] for btn in buttons)), default=0)
+        grid = np.full((height, width), -1, dtype=np.int8)
+        for i, btn in enumerate(buttons):
+            bx, by, bw, bh = btn["rect"]
+            # Edges are outside the button, as in a strict bx < x < bx + bw test
+            grid[max(by + 1, 0):by + bh, max(bx + 1, 0):bx + bw] = i
+        self._hit_grid = grid
+        self._hit_buttons = buttons
+
+    def button_at(self, x, y):
+        """Return the button under (x, y), or None."""
+        grid = self._hit_grid
+        if 0 <= y < grid.shape[0] and 0 <= x < grid.shape[1]:
+            index = grid[y, x]
+            if index >= 0:
+                return self._hit_buttons[index]
+        return None
+
+    def process_events(self):
+        """Run the actions for every event queued since the last call."""
+        for _ in range(len(self.events)):
+            kind, a, b = self.events.popleft()
+            if kind == "click":
+                btn = self.button_at(a, b)
+                if btn is not None:
                     btn["callback"]()
+            elif kind == "key":
+                action = self.shortcuts.get(a)
+                if action is not None:
+                    self.actions[action]()
 
     def setup_buttons(self):
         """Configure buttons with callbacks."""
@@ -49,4 +112,4 @@ class UserInteraction:
                 "callback": self.on_close
             }
         ]
-        return self.buttons
\ No newline at end of file
+        return self.buttons
@@ -1,9 +1,14 @@
 import cv2 as cv
 import numpy as np
-from math import cos, sin, pi
+from math import cos, sin, pi, floor
+from profiler import profiler
 
 class UserInterface:
-    def __init__(self, screen_width=1280, screen_height=720, video_width=640, video_height=480):
+    # Glass effect quality for the live video region
+    GLASS_QUALITIES = ("high", "fast", "off")
+
+    def __init__(self, screen_width=1280, screen_height=720, video_width=640, video_height=480,
+                 glass_quality="high"):
         self.screen_width = screen_width
         self.screen_height = screen_height
         self.video_width = video_width
@@ -15,114 +20,224 @@ class UserInterface:
         self.text_color = (50, 50, 50)
         self.accent_color = (102, 204, 153)
         self.font_scale = 0.7
+        self.title_bar_height = 60
+        self.glass_quality = glass_quality
+        self.glass_kernel = (21, 21)
+        self.fast_blur_scale = 4
+
+        # Pre-rendered chrome and the reusable output buffer
+        self._static_layer = None
+        self._static_key = None
+        self._screen = np.empty((self.screen_height, self.screen_width, 3), dtype=np.uint8)
+
+        # Rasterized timer rings, keyed by (center, radius, thickness)
+        self._progress_rings = {}
+
+        # Reusable blur outputs keyed by shape
+        self._blur_buffers = {}
+
+        # Status box layout for the last game state version seen
+        self._status_version = None
+        self._status_cache = None
+
+        # Called with the buttons whenever their rects are (re)assigned
+        self.on_layout = None
 
     def draw_rounded_rect(self, img, top_left, bottom_right, color, thickness=2, r=15):
         """Draw a rounded rectangle."""
         x1, y1 = top_left
         x2, y2 = bottom_right
         if thickness < 0:
-            overlay = img.copy()
+            # Blend only the rectangle's bounding box instead of the whole image
+            ox, oy = max(x1, 0), max(y1, 0)
+            roi = img[oy:max(y2 + 1, oy), ox:max(x2 + 1, ox)]
+            if roi.size == 0:
+                return
+            x1, x2, y1, y2 = x1 - ox, x2 - ox, y1 - oy, y2 - oy
+            overlay = roi.copy()
             cv.rectangle(overlay, (x1 + r, y1), (x2 - r, y2), color, thickness)
             cv.rectangle(overlay, (x1, y1 + r), (x2, y2 - r), color, thickness)
             for pt in [(x1 + r, y1 + r), (x2 - r, y1 + r), (x1 + r, y2 - r), (x2 - r, y2 - r)]:
                 cv.circle(overlay, pt, r, color, thickness)
-            cv.addWeighted(overlay, 0.6, img, 0.4, 0, img)
+            cv.addWeighted(overlay, 0.6, roi, 0.4, 0, roi)
         else:
             cv.rectangle(img, (x1 + r, y1), (x2 - r, y2), color, thickness)
             cv.rectangle(img, (x1, y1 + r), (x2, y2 - r), color, thickness)
             for pt in [(x1 + r, y1 + r), (x2 - r, y1 + r), (x1 + r, y2 - r), (x2 - r, y2 - r)]:
                 cv.ellipse(img, pt, (r, r), 90, 0, 90, color, thickness)
 
-    def apply_glass_effect(self, img, top_left, bottom_right, blur_kernel=(21, 21), alpha=0.5):
-        """Apply a frosted glass effect to a region."""
+    @property
+    def glass_quality(self):
+        return self._glass_quality
+
+    @glass_quality.setter
+    def glass_quality(self, quality):
+        if quality not in self.GLASS_QUALITIES:
+            raise ValueError(f"glass_quality must be one of {self.GLASS_QUALITIES}, got {quality!r}")
+        self._glass_quality = quality
+
+    def _fast_blur(self, roi, blur_kernel):
+        """Approximate a Gaussian blur with a box blur on a downscaled copy."""
+        h, w = roi.shape[:2]
+        scale = self.fast_blur_scale
+        small = cv.resize(roi, (max(w // scale, 1), max(h // scale, 1)), interpolation=cv.INTER_AREA)
+        k = (blur_kernel[0] // (2 * scale)) | 1
+        cv.blur(small, (k, k), dst=small)
+        return cv.resize(small, (w, h), interpolation=cv.INTER_LINEAR)
+
+    def apply_glass_effect(self, img, top_left, bottom_right, blur_kernel=None, alpha=0.5,
+                           quality="high"):
+        """Apply a frosted glass effect to a region.
+
+        ``quality`` selects a full Gaussian blur ("high"), a downscaled box
+        blur ("fast") or no effect ("off").
+        """
+        if quality == "off":
+            return
+        blur_kernel = blur_kernel or self.glass_kernel
         x1, y1 = top_left
         x2, y2 = bottom_right
         roi = img[y1:y2, x1:x2]
-        blurred = cv.GaussianBlur(roi, blur_kernel, 0)
-        glassy_roi = cv.addWeighted(blurred, alpha, roi, 1 - alpha, 0)
-        img[y1:y2, x1:x2] = glassy_roi
+        self._glass(roi, roi, blur_kernel, alpha, quality)
+
+    def _glass(self, src, dst, blur_kernel, alpha, quality):
+        """Write src blended with a blurred copy of itself into dst (which may be src)."""
+        if quality == "fast":
+            blurred = self._fast_blur(src, blur_kernel)
+        else:
+            buffer = self._blur_buffers.get(src.shape)
+            if buffer is None:
+                buffer = self._blur_buffers[src.shape] = np.empty(src.shape, dtype=np.uint8)
+            blurred = cv.GaussianBlur(src, blur_kernel, 0, dst=buffer)
+        cv.addWeighted(blurred, alpha, src, 1 - alpha, 0, dst=dst)
+
+    def _progress_ring(self, center, radius, thickness):
+        """Return the cached ring raster for a timer and the origin of its box.
+
+        Each pixel holds the index of the first of the 360 one-degree dots
+        that covers it (65535 if none), so the pixels lit at a given progress
+        are simply those below the number of dots drawn.
+        """
+        key = (center, radius, thickness)
+        ring = self._progress_rings.get(key)
+        if ring is None:
+            reach = radius + thickness
+            ox, oy = center[0] - reach, center[1] - reach
+            labels = np.full((2 * reach + 1, 2 * reach + 1), 65535, dtype=np.uint16)
+            # Draw the last dot first so each pixel keeps the lowest index
+            for i in reversed(range(360)):
+                angle = i * pi / 180
+                x = int(center[0] + radius * cos(angle))
+                y = int(center[1] + radius * sin(angle))
+                cv.circle(labels, (x - ox, y - oy), thickness // 2, i, -1)
+            ring = (labels, ox, oy)
+            self._progress_rings[key] = ring
+        return ring
 
     def draw_circular_progress(self, img, center, radius, progress, color):
         """Draw a circular progress bar."""
         thickness = 10
-        for i in range(360):
-            angle = i * pi / 180
-            x = int(center[0] + radius * cos(angle))
-            y = int(center[1] + radius * sin(angle))
-            if i <= progress * 360:
-                cv.circle(img, (x, y), thickness // 2, color, -1)
+        dots = min(floor(progress * 360) + 1, 360) if progress >= 0 else 0
+        if dots == 0:
+            return
+        labels, ox, oy = self._progress_ring(tuple(center), radius, thickness)
+        h, w = labels.shape
+        x1, y1 = max(ox, 0), max(oy, 0)
+        x2, y2 = min(ox + w, img.shape[1]), min(oy + h, img.shape[0])
+        if x1 >= x2 or y1 >= y2:
+            return
+        roi = img[y1:y2, x1:x2]
+        roi[labels[y1 - oy:y2 - oy, x1 - ox:x2 - ox] < dots] = color
 
-    def render(self, frame, game_state, buttons):
-        """Render the entire UI."""
-        full_screen = np.ones((self.screen_height, self.screen_width, 3), dtype=np.uint8) * 255
+    def message_frame(self, text):
+        """Return a dark video-sized frame with centered text, e.g. while the camera starts."""
+        frame = np.full((self.video_height, self.video_width, 3), 30, dtype=np.uint8)
+        (tw, th), _ = cv.getTextSize(text, cv.FONT_HERSHEY_SIMPLEX, 0.9, 2)
+        cv.putText(frame, text, ((self.video_width - tw) // 2, (self.video_height + th) // 2),
+                   cv.FONT_HERSHEY_SIMPLEX, 0.9, (220, 220, 220), 2)
+        return frame
+
+    def info_panel_rect(self):
+        """Return the (x, y, w, h) of the game info panel."""
+        info_x = self.padding + self.video_width + self.padding
+        info_y = self.title_bar_height + self.padding
+        return info_x, info_y, self.screen_width - info_x - self.padding, self.video_height
+
+    def layout_buttons(self, buttons):
+        """Assign each button its on-screen rect."""
+        button_width = 120
+        button_height = 40
+        button_spacing = 20
+        total_buttons_width = (button_width * 4) + (button_spacing * 3)
+        start_x = (self.screen_width - total_buttons_width) // 2
+        for i, btn in enumerate(buttons):
+            btn["rect"] = (start_x + i * (button_width + button_spacing), 640, button_width, button_height)
+        if self.on_layout:
+            self.on_layout(buttons)
+
+    def invalidate_static_layer(self):
+        """Force the static chrome to be redrawn on the next render."""
+        self._static_key = None
+
+    def _get_static_layer(self, buttons):
+        """Return the cached static chrome, rebuilding it if the layout changed."""
+        key = (self.screen_width, self.screen_height,
+               tuple((id(btn), btn["name"], btn["color"]) for btn in buttons))
+        if key != self._static_key:
+            self._static_layer = self._build_static_layer(buttons)
+            self._static_key = key
+        return self._static_layer
+
+    def _build_static_layer(self, buttons):
+        """Draw everything that does not change from frame to frame."""
+        layer = np.full((self.screen_height, self.screen_width, 3), 255, dtype=np.uint8)
 
         # Title bar
-        title_bar_height = 60
-        cv.rectangle(full_screen, (0, 0), (self.screen_width, title_bar_height), self.title_bg, -1)
-        cv.putText(full_screen, "Rock Paper Scissors - Best of 3", (20, 40),
+        cv.rectangle(layer, (0, 0), (self.screen_width, self.title_bar_height), self.title_bg, -1)
+        cv.putText(layer, "Rock Paper Scissors - Best of 3", (20, 40),
                    cv.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
-        cv.putText(full_screen, f"You: {game_state['player_score']} - Computer: {game_state['computer_score']}",
-                   (self.screen_width - 300, 40), cv.FONT_HERSHEY_SIMPLEX, 0.8, self.accent_color, 2)
-
-        # Video feed
-        full_screen[title_bar_height + self.padding: title_bar_height + self.padding + self.video_height,
-                    self.padding: self.padding + self.video_width] = frame
-        self.apply_glass_effect(full_screen,
-                               (self.padding, title_bar_height + self.padding),
-                               (self.padding + self.video_width, title_bar_height + self.padding + self.video_height))
 
         # Game info panel
-        info_x = self.padding + self.video_width + self.padding
-        info_y = title_bar_height + self.padding
-        info_w = self.screen_width - info_x - self.padding
-        info_h = self.video_height
-        self.apply_glass_effect(full_screen, (info_x, info_y), (self.screen_width - self.padding, info_y + info_h))
+        info_x, info_y, info_w, info_h = self.info_panel_rect()
+        # Drawn once per static layer rebuild, so it is not cached separately
+        self.apply_glass_effect(layer, (info_x, info_y), (info_x + info_w, info_y + info_h))
 
         # Section title
         section_y = info_y + 30
-        cv.putText(full_screen, "GAME INFORMATION", (info_x + 20, section_y),
+        cv.putText(layer, "GAME INFORMATION", (info_x + 20, section_y),
                    cv.FONT_HERSHEY_SIMPLEX, 0.7, (80, 80, 80), 1)
-        cv.line(full_screen, (info_x + 20, section_y + 15), (self.screen_width - self.padding - 20, section_y + 15),
+        cv.line(layer, (info_x + 20, section_y + 15), (self.screen_width - self.padding - 20, section_y + 15),
                 (200, 200, 200), 1)
 
-        # Computer move
+        # Field labels
         comp_box_y = section_y + 40
-        cv.putText(full_screen, "Computer Move:", (info_x + 20, comp_box_y),
-                   cv.FONT_HERSHEY_SIMPLEX, 0.7, (60, 60, 60), 2)
-        if game_state['computer_move']:
-            move_text = game_state['computer_move'].upper()
-            move_box_x = info_x + 200
-            move_box_y = comp_box_y - 25
-            self.draw_rounded_rect(full_screen,
-                                   (move_box_x, move_box_y),
-                                   (move_box_x + 120, move_box_y + 35),
-                                   (30, 30, 30), thickness=cv.FILLED, r=10)
-            cv.putText(full_screen, move_text, (move_box_x + 15, comp_box_y),
-                       cv.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
-        else:
-            cv.putText(full_screen, "Waiting...", (info_x + 200, comp_box_y),
-                       cv.FONT_HERSHEY_SIMPLEX, 0.7, (100, 100, 100), 2)
-
-        # Timer
         timer_y = comp_box_y + 60
-        cv.putText(full_screen, "Timer:", (info_x + 20, timer_y),
-                   cv.FONT_HERSHEY_SIMPLEX, 0.7, (60, 60, 60), 2)
-        timer_progress = game_state['clock'] / 100
-        self.draw_circular_progress(full_screen, (info_x + 200, timer_y - 10), 30, timer_progress, self.accent_color)
-        cv.putText(full_screen, f"{game_state['clock']}", (info_x + 190, timer_y + 5),
-                   cv.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 1)
-
-        # Game status
         status_y = timer_y + 80
-        cv.putText(full_screen, "Status:", (info_x + 20, status_y),
+        cv.putText(layer, "Computer Move:", (info_x + 20, comp_box_y),
                    cv.FONT_HERSHEY_SIMPLEX, 0.7, (60, 60, 60), 2)
-        status_box_x = info_x + 120
-        status_box_y = status_y - 25
-        status_box_width = info_w - 120
-        status_box_height = 100
+        cv.putText(layer, "Timer:", (info_x + 20, timer_y),
+                   cv.FONT_HERSHEY_SIMPLEX, 0.7, (60, 60, 60), 2)
+        cv.putText(layer, "Status:", (info_x + 20, status_y),
+                   cv.FONT_HERSHEY_SIMPLEX, 0.7, (60, 60, 60), 2)
+
+        # Buttons
+        self.layout_buttons(buttons)
+        for btn in buttons:
+            bx, by, bw, bh = btn["rect"]
+            self.draw_rounded_rect(layer, (bx, by), (bx + bw, by + bh), btn["color"], thickness=cv.FILLED, r=10)
+            cv.putText(layer, btn["name"], (bx + 10, by + 25),
+                       cv.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+
+        return layer
+
+    def _status_layout(self, game_state):
+        """Return the status box color, text lines and game text, cached per state version."""
+        version = (id(game_state), game_state.version)
+        if version == self._status_version:
+            return self._status_cache
 
         # Get status text, with fallback
-        game_text = game_state['game_text'] if game_state['game_text'] else "Waiting for game to start..."
+        game_text = game_state.game_text if game_state.game_text else "Waiting for game to start..."
 
         # Determine status box color based on content
         if "You win" in game_text.lower():
@@ -134,17 +249,11 @@ class UserInterface:
         else:
             status_color = (200, 200, 200)  # Slightly darker neutral for better contrast
 
-        # Draw status box
-        self.draw_rounded_rect(full_screen,
-                               (status_box_x, status_box_y),
-                               (status_box_x + status_box_width, status_box_y + status_box_height),
-                               status_color, thickness=cv.FILLED, r=10)
-
         # Format status text with icons and line breaks
         lines = []
         if "Round" in game_text and "Get Ready" in game_text:
-            countdown = max(0, 20 - game_state['clock'])
-            lines.append(f"Round {game_state['round_number']} of 3")
+            countdown = max(0, 20 - game_state.clock)
+            lines.append(f"Round {game_state.round_number} of 3")
             lines.append(f"Get Ready! ({countdown}s)")
         elif "You win" in game_text.lower():
             lines.append("✅ You Win!")
@@ -168,6 +277,76 @@ class UserInterface:
             if current_line:
                 lines.append(current_line.strip())
 
+        self._status_version = version
+        self._status_cache = (status_color, lines, game_text)
+        return self._status_cache
+
+    def render(self, frame, game_state, buttons):
+        """Render the entire UI.
+
+        The returned image is an internal buffer that is overwritten by the
+        next call; copy it if it has to outlive the current frame.
+        """
+        full_screen = self._screen
+        with profiler.span("render.static"):
+            np.copyto(full_screen, self._get_static_layer(buttons))
+        title_bar_height = self.title_bar_height
+
+        # Scores
+        cv.putText(full_screen, f"You: {game_state.player_score} - Computer: {game_state.computer_score}",
+                   (self.screen_width - 300, 40), cv.FONT_HERSHEY_SIMPLEX, 0.8, self.accent_color, 2)
+
+        # Video feed
+        # The glass effect reads the frame and writes straight into the screen
+        video = full_screen[title_bar_height + self.padding: title_bar_height + self.padding + self.video_height,
+                            self.padding: self.padding + self.video_width]
+        with profiler.span("render.video"):
+            if self.glass_quality == "off":
+                np.copyto(video, frame)
+            else:
+                self._glass(frame, video, self.glass_kernel, 0.5, self.glass_quality)
+
+        info_x, info_y, info_w, info_h = self.info_panel_rect()
+        section_y = info_y + 30
+
+        # Computer move
+        comp_box_y = section_y + 40
+        if game_state.computer_move:
+            move_text = game_state.computer_move.upper()
+            move_box_x = info_x + 200
+            move_box_y = comp_box_y - 25
+            self.draw_rounded_rect(full_screen,
+                                   (move_box_x, move_box_y),
+                                   (move_box_x + 120, move_box_y + 35),
+                                   (30, 30, 30), thickness=cv.FILLED, r=10)
+            cv.putText(full_screen, move_text, (move_box_x + 15, comp_box_y),
+                       cv.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+        else:
+            cv.putText(full_screen, "Waiting...", (info_x + 200, comp_box_y),
+                       cv.FONT_HERSHEY_SIMPLEX, 0.7, (100, 100, 100), 2)
+
+        # Timer
+        timer_y = comp_box_y + 60
+        timer_progress = game_state.clock / 100
+        self.draw_circular_progress(full_screen, (info_x + 200, timer_y - 10), 30, timer_progress, self.accent_color)
+        cv.putText(full_screen, f"{game_state.clock}", (info_x + 190, timer_y + 5),
+                   cv.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 1)
+
+        # Game status
+        status_y = timer_y + 80
+        status_box_x = info_x + 120
+        status_box_y = status_y - 25
+        status_box_width = info_w - 120
+        status_box_height = 100
+
+        status_color, lines, game_text = self._status_layout(game_state)
+
+        # Draw status box
+        self.draw_rounded_rect(full_screen,
+                               (status_box_x, status_box_y),
+                               (status_box_x + status_box_width, status_box_y + status_box_height),
+                               status_color, thickness=cv.FILLED, r=10)
+
         # Draw status text
         text_y_pos = status_box_y + 25
         for line in lines:
@@ -176,12 +355,14 @@ class UserInterface:
             text_y_pos += 25
 
         # Match result overlay
-        if game_state['match_ended']:
+        if game_state.match_ended:
             overlay_x = self.screen_width // 4
             overlay_y = self.screen_height // 3
             overlay_w = self.screen_width // 2
             overlay_h = self.screen_height // 3
-            self.apply_glass_effect(full_screen, (overlay_x, overlay_y), (overlay_x + overlay_w, overlay_y + overlay_h))
+            # Not cached: the overlay covers live video, so its input changes every frame
+            self.apply_glass_effect(full_screen, (overlay_x, overlay_y), (overlay_x + overlay_w, overlay_y + overlay_h),
+                                    quality=self.glass_quality)
             self.draw_rounded_rect(full_screen,
                                    (overlay_x, overlay_y),
                                    (overlay_x + overlay_w, overlay_y + overlay_h),
@@ -192,17 +373,4 @@ class UserInterface:
             cv.putText(full_screen, "Click Reset to Play Again!", (overlay_x + 20, overlay_y + 100),
                        cv.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
 
-        # Buttons
-        button_width = 120
-        button_height = 40
-        button_spacing = 20
-        total_buttons_width = (button_width * 4) + (button_spacing * 3)
-        start_x = (self.screen_width - total_buttons_width) // 2
-        for i, btn in enumerate(buttons):
-            btn["rect"] = (start_x + i * (button_width + button_spacing), 640, button_width, button_height)
-            bx, by, bw, bh = btn["rect"]
-            self.draw_rounded_rect(full_screen, (bx, by), (bx + bw, by + bh), btn["color"], thickness=cv.FILLED, r=10)
-            cv.putText(full_screen, btn["name"], (bx + 10, by + 25),
-                       cv.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-
-        return full_screen
\ No newline at end of file
+        return full_screen